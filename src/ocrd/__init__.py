@@ -14,12 +14,35 @@ Related (and dependent) packages:
 
 """
 
+from typing import TYPE_CHECKING
+
 from ocrd.processor.base import run_processor, run_cli, Processor, ResourceNotFoundError
 from ocrd.processor.ocrd_page_result import OcrdPageResult, OcrdPageResultImage
 from ocrd_models import OcrdMets, OcrdPage, OcrdExif, OcrdFile, OcrdAgent
 from ocrd.resolver import Resolver
-from ocrd_validators import *
+from ocrd_validators import (
+    ParameterValidator,
+    WorkspaceValidator,
+    OcrdToolValidator,
+    OcrdResourceListValidator,
+    OcrdZipValidator,
+    XsdValidator,
+    XsdMetsValidator,
+    XsdPageValidator,
+    ProcessingServerConfigValidator,
+    OcrdNetworkMessageValidator
+)
 from ocrd.workspace import Workspace
 from ocrd.workspace_backup import WorkspaceBackupManager
 from ocrd.resource_manager import OcrdResourceManager
 from ocrd.mets_server import OcrdMetsServer
+
+if TYPE_CHECKING:
+    from ocrd_validators import PageValidator
+
+def __getattr__(name):
+    # (needs the PAGE model, which is expensive to import)
+    if name == 'PageValidator':
+        from ocrd_validators import PageValidator
+        return PageValidator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
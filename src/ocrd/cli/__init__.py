@@ -5,6 +5,7 @@ OCR-D Command-line interface
     :prog: ocrd
     :nested: short
 """
+from importlib import import_module
 import re
 import click
 
@@ -27,15 +28,46 @@ def command_with_replaced_help(*replacements):
 # pylint: enable=wrong-import-position
 
 from ..decorators import ocrd_loglevel
-from .ocrd_tool import ocrd_tool_cli
-from .workspace import workspace_cli
-from .process import process_cli
-from .bashlib import bashlib_cli
-from .validate import validate_cli
-from .resmgr import resmgr_cli
-from .zip import zip_cli
-from .log import log_cli
-from .network import network_cli
+
+# subcommand name -> (submodule, attribute), imported only when needed
+_subcommands = {
+    'ocrd-tool': ('ocrd_tool', 'ocrd_tool_cli'),
+    'workspace': ('workspace', 'workspace_cli'),
+    'process': ('process', 'process_cli'),
+    'bashlib': ('bashlib', 'bashlib_cli'),
+    'zip': ('zip', 'zip_cli'),
+    'validate': ('validate', 'validate_cli'),
+    'log': ('log', 'log_cli'),
+    'resmgr': ('resmgr', 'resmgr_cli'),
+    'network': ('network', 'network_cli'),
+}
+
+def _load_subcommand(module_name, attr_name):
+    return getattr(import_module(f'{__name__}.{module_name}'), attr_name)
+
+def __getattr__(name):
+    for module_name, attr_name in _subcommands.values():
+        if name == attr_name:
+            return _load_subcommand(module_name, attr_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LazyGroup(click.Group):
+    """
+    Group which imports the modules of its subcommands only when they
+    are dispatched to (or listed in the help), avoiding the (considerable)
+    import cost of all subcommands on every invocation.
+    """
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(list(super().list_commands(ctx)) + list(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return _load_subcommand(*self.lazy_subcommands[cmd_name])
+        return super().get_command(ctx, cmd_name)
 
 
 __all__ = ['cli']
@@ -96,20 +128,10 @@ Variables:
 {config.describe('OCRD_LOGGING_DEBUG')}
 """
 
-@click.group(epilog=_epilog)
+@click.group(cls=LazyGroup, lazy_subcommands=_subcommands, epilog=_epilog)
 @click.version_option(package_name='ocrd')
 @ocrd_loglevel
 def cli(**kwargs): # pylint: disable=unused-argument
     """
     Entry-point of multi-purpose CLI for OCR-D
     """
-
-cli.add_command(ocrd_tool_cli)
-cli.add_command(workspace_cli)
-cli.add_command(process_cli)
-cli.add_command(bashlib_cli)
-cli.add_command(zip_cli)
-cli.add_command(validate_cli)
-cli.add_command(log_cli)
-cli.add_command(resmgr_cli)
-cli.add_command(network_cli)
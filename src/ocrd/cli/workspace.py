@@ -485,10 +485,9 @@ def workspace_find(ctx, file_grp, mimetype, page_id, file_id, output_field, incl
         workspace.save_mets()
     if 'pageId' in output_field:
         idx = output_field.index('pageId')
-        fileIds = list(map(lambda fields: fields[idx], ret))
-        pages = workspace.mets.get_physical_pages(for_fileIds=fileIds)
-        for fields, page in zip(ret, pages):
-            fields[idx] = page or ''
+        pages = workspace.mets.get_physical_pages_for_files(fields[idx] for fields in ret)
+        for fields in ret:
+            fields[idx] = pages[fields[idx]] or ''
     for fields in ret:
         print('\t'.join(fields))
 
@@ -1,12 +1,16 @@
 """
 # METS server functionality
 """
+from contextlib import contextmanager
+from itertools import chain, islice
+import json
 import os
 import re
 from os import _exit, chmod
 import signal
-from typing import Dict, Optional, Union, List, Tuple
-from time import sleep
+from typing import Dict, Iterator, Optional, Union, List, Tuple
+from threading import Condition, Thread, local
+from time import monotonic, sleep
 from pathlib import Path
 from subprocess import Popen, run as subprocess_run
 from urllib.parse import urlparse
@@ -14,17 +18,28 @@ import socket
 import atexit
 
 from fastapi import FastAPI, Request, Form, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from requests import Session as requests_session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
-from requests_unixsocket import Session as requests_unixsocket_session
+from requests_unixsocket import Session as requests_unixsocket_session, DEFAULT_SCHEME as UDS_SCHEME
+from requests_unixsocket.adapters import UnixAdapter
 from pydantic import BaseModel, Field, ValidationError
 
 import uvicorn
+import msgpack
 
 from ocrd_models import OcrdFile, ClientSideOcrdFile, OcrdAgent, ClientSideOcrdAgent
-from ocrd_utils import getLogger
+from ocrd_utils import config, getLogger
 
+# number of files serialized per chunk of a streamed GET /file/stream response
+FIND_FILES_STREAM_CHUNK_SIZE = 1000
+
+# media type of the optional compact encoding for structured responses
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+# response header with the server's generation (as of receiving the request)
+GENERATION_HEADER = 'X-Mets-Generation'
 
 #
 # Models
@@ -70,11 +85,13 @@ class OcrdFileListModel(BaseModel):
     files: List[OcrdFileModel] = Field()
 
     @staticmethod
-    def create(files: List[OcrdFile]):
+    def create(files: List[OcrdFile], page_ids: Optional[Dict[str, Optional[str]]] = None):
+        if page_ids is None:
+            page_ids = {f.ID: f.pageId for f in files}
         ret = OcrdFileListModel(
             files=[
                 OcrdFileModel.create(
-                    file_grp=f.fileGrp, file_id=f.ID, mimetype=f.mimetype, page_id=f.pageId, url=f.url,
+                    file_grp=f.fileGrp, file_id=f.ID, mimetype=f.mimetype, page_id=page_ids[f.ID], url=f.url,
                     local_filename=f.local_filename
                 ) for f in files
             ]
@@ -82,6 +99,14 @@ class OcrdFileListModel(BaseModel):
         return ret
 
 
+class OcrdFileAddModel(OcrdFileModel):
+    force: bool = Field(False)
+
+
+class OcrdFileAddListModel(BaseModel):
+    files: List[OcrdFileAddModel] = Field()
+
+
 class OcrdFileGroupListModel(BaseModel):
     file_groups: List[str] = Field()
 
@@ -126,9 +151,17 @@ class ClientSideOcrdMets:
     :py:meth:`ocrd_models.ocrd_mets.OcrdMets.agents`,
     :py:meth:`ocrd_models.ocrd_mets.OcrdMets.add_file` to query via HTTP a
     :py:class:`ocrd.mets_server.OcrdMetsServer`.
+
+    If ``cache_flag`` is set (default: ``OCRD_METS_CLIENT_CACHING``), then results of
+    :py:attr:`physical_pages`, :py:attr:`file_groups` and :py:meth:`find_files` are
+    kept and reused as long as the server's :py:attr:`generation` is unchanged.
+    The generation is sent along with every response, and only queried explicitly
+    if none has been seen for ``OCRD_METS_CLIENT_CACHE_MAX_AGE`` seconds.
+
+    If ``OCRD_METS_SERVER_MSGPACK`` is set, then structured responses are requested in msgpack instead of JSON encoding.
     """
 
-    def __init__(self, url, workspace_path: Optional[str] = None):
+    def __init__(self, url, workspace_path: Optional[str] = None, cache_flag: Optional[bool] = None):
         self.protocol = "tcp" if url.startswith("http://") else "uds"
         self.log = getLogger(f"ocrd.models.ocrd_mets.client.{url}")
         self.url = url if self.protocol == "tcp" else f'http+unix://{url.replace("/", "%2F").replace(".", "%2E")}'
@@ -141,14 +174,133 @@ class ClientSideOcrdMets:
                 raise ValueError("ClientSideOcrdMets runs in multiplexing mode but the workspace dir path is not set!")
         else:
             self.multiplexing_mode = False
+        self._session = None
+        self._session_pid = None
+        self._cache_flag = config.OCRD_METS_CLIENT_CACHING if cache_flag is None else cache_flag
+        self._cache = {}
+        self._cache_generation = None
+        # when the generation was last seen (in any response)
+        self._cache_validated = None
+        # whether the server supports GET /file/stream (until it responds 404)
+        self._stream_files = True
+        # files to add by the end of :py:meth:`batch` (per thread)
+        self._batch = local()
 
     @property
     def session(self) -> Union[requests_session, requests_unixsocket_session]:
-        return requests_session() if self.protocol == "tcp" else requests_unixsocket_session()
+        """
+        HTTP session with pooled keep-alive connections to the METS server,
+        created lazily once per client and process (connections must not be
+        shared with forked children).
+        """
+        if self._session is None or self._session_pid != os.getpid():
+            pool_size = config.OCRD_METS_SERVER_POOL_SIZE
+            if self.protocol == "tcp":
+                session = requests_session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+            else:
+                session = requests_unixsocket_session()
+                session.mount(UDS_SCHEME, UnixAdapter(pool_connections=pool_size))
+            if config.OCRD_METS_SERVER_MSGPACK:
+                session.headers["Accept"] = f"{MSGPACK_MEDIA_TYPE}, application/json"
+            session.hooks["response"].append(self._observe_generation)
+            self._session = session
+            self._session_pid = os.getpid()
+        return self._session
 
     def __getattr__(self, name):
         raise NotImplementedError(f"ClientSideOcrdMets has no access to '{name}' - try without METS server")
 
+    @property
+    def generation(self) -> int:
+        """
+        Number of modifications the METS server has applied so far
+        """
+        if not self.multiplexing_mode:
+            return int(self.session.request("GET", f"{self.url}/generation").text)
+        else:
+            return int(self.session.request(
+                "POST",
+                self.url,
+                json=MpxReq.generation(self.ws_dir_path)
+            ).json()["text"])
+
+    @staticmethod
+    def _decode(response) -> Union[Dict, List]:
+        """
+        Decode a structured response according to its (negotiated) content type
+        """
+        if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            return msgpack.unpackb(response.content)
+        return response.json()
+
+    def _observe_generation(self, response, *args, **kwargs):
+        """
+        Drop all cached results if the generation sent along with ``response``
+        differs from theirs, or if the request may have modified the METS.
+        """
+        generation = response.headers.get(GENERATION_HEADER)
+        if generation is None:
+            # (multiplexing mode or older server)
+            return
+        if response.request.method != "GET":
+            # generation as of before the modification
+            self._cache = {}
+            self._cache_generation = None
+            return
+        self._update_generation(int(generation))
+
+    def _update_generation(self, generation: int):
+        if generation != self._cache_generation:
+            self._cache = {}
+            self._cache_generation = generation
+        self._cache_validated = monotonic()
+
+    def _revalidate(self):
+        """
+        Drop all cached results if the METS has been modified since they were fetched
+        (unless the generation has been seen recently enough)
+        """
+        if (self._cache_generation is not None and
+            monotonic() - self._cache_validated < config.OCRD_METS_CLIENT_CACHE_MAX_AGE):
+            return
+        # (results fetched after this are at least as recent)
+        self._update_generation(self.generation)
+
+    def _cached(self, key, fetch):
+        """
+        Get the result for :py:attr:`key` from the cache if still valid, otherwise
+        from calling :py:attr:`fetch`.
+        """
+        if not self._cache_flag:
+            return fetch()
+        self._revalidate()
+        if key not in self._cache:
+            self._cache[key] = fetch()
+        return self._cache[key]
+
+    def _cached_iter(self, key, fetch):
+        """
+        Like :py:meth:`_cached`, but for an iterable result, which gets passed
+        through while fetching (and cached only once it has been exhausted).
+        """
+        if not self._cache_flag:
+            yield from fetch()
+            return
+        self._revalidate()
+        if key in self._cache:
+            yield from self._cache[key]
+            return
+        # (not into a cache invalidated meanwhile)
+        cache = self._cache
+        results = []
+        for result in fetch():
+            results.append(result)
+            yield result
+        cache[key] = results
+
     def __str__(self):
         return f"<ClientSideOcrdMets[url={self.url}]>"
 
@@ -221,36 +373,45 @@ class ClientSideOcrdMets:
 
     @property
     def physical_pages(self) -> List[str]:
+        return list(self._cached("physical_pages", self._physical_pages))
+
+    def _physical_pages(self) -> List[str]:
         if not self.multiplexing_mode:
-            return self.session.request("GET", f"{self.url}/physical_pages").json()["physical_pages"]
+            r = self.session.request("GET", f"{self.url}/physical_pages")
         else:
-            return self.session.request(
+            r = self.session.request(
                 "POST",
                 self.url,
                 json=MpxReq.physical_pages(self.ws_dir_path)
-            ).json()["physical_pages"]
+            )
+        return self._decode(r)["physical_pages"]
 
     @property
     def file_groups(self):
+        return list(self._cached("file_groups", self._file_groups))
+
+    def _file_groups(self):
         if not self.multiplexing_mode:
-            return self.session.request("GET", f"{self.url}/file_groups").json()["file_groups"]
+            r = self.session.request("GET", f"{self.url}/file_groups")
         else:
-            return self.session.request(
+            r = self.session.request(
                 "POST",
                 self.url,
                 json=MpxReq.file_groups(self.ws_dir_path)
-            ).json()["file_groups"]
+            )
+        return self._decode(r)["file_groups"]
 
     @property
     def agents(self):
         if not self.multiplexing_mode:
-            agent_dicts = self.session.request("GET", f"{self.url}/agent").json()["agents"]
+            r = self.session.request("GET", f"{self.url}/agent")
         else:
-            agent_dicts = self.session.request(
+            r = self.session.request(
                 "POST",
                 self.url,
                 json=MpxReq.agents(self.ws_dir_path)
-            ).json()["agents"]
+            )
+        agent_dicts = self._decode(r)["agents"]
 
         for agent_dict in agent_dicts:
             agent_dict["_type"] = agent_dict.pop("type")
@@ -277,20 +438,51 @@ class ClientSideOcrdMets:
         if "fileGrp" in kwargs:
             kwargs["file_grp"] = kwargs.pop("fileGrp")
 
+        key = ("find_files", json.dumps(kwargs, sort_keys=True, default=str))
+        for f in self._cached_iter(key, lambda: self._find_file_dicts(kwargs)):
+            yield self._file_from_dict(f)
+
+    def _find_file_dicts(self, kwargs: Dict):
+        if not self.multiplexing_mode and self._stream_files:
+            # consume newline-delimited JSON (or concatenated msgpack) incrementally
+            with self.session.request(
+                method="GET", url=f"{self.url}/file/stream", params={**kwargs}, stream=True
+            ) as r:
+                if r.status_code == 404:
+                    self.log.debug("METS server does not support streaming, falling back to GET /file")
+                    self._stream_files = False
+                elif not r.ok:
+                    raise RuntimeError(f"Failed to find files ({kwargs}): {r.text}")
+                elif r.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+                    unpacker = msgpack.Unpacker()
+                    for chunk in r.iter_content(chunk_size=None):
+                        unpacker.feed(chunk)
+                        yield from unpacker
+                    return
+                else:
+                    for line in r.iter_lines():
+                        if line:
+                            yield json.loads(line)
+                    return
         if not self.multiplexing_mode:
             r = self.session.request(method="GET", url=f"{self.url}/file", params={**kwargs})
+            if not r.ok:
+                raise RuntimeError(f"Failed to find files ({kwargs}): {r.text}")
+            yield from self._decode(r)["files"]
         else:
             r = self.session.request(
                 "POST",
                 self.url,
                 json=MpxReq.find_files(self.ws_dir_path, {**kwargs})
             )
+            yield from self._decode(r)["files"]
 
-        for f in r.json()["files"]:
-            yield ClientSideOcrdFile(
-                None, ID=f["file_id"], pageId=f["page_id"], fileGrp=f["file_grp"], url=f["url"],
-                local_filename=f["local_filename"], mimetype=f["mimetype"]
-            )
+    @staticmethod
+    def _file_from_dict(f: Dict) -> ClientSideOcrdFile:
+        return ClientSideOcrdFile(
+            None, ID=f["file_id"], pageId=f["page_id"], fileGrp=f["file_grp"], url=f["url"],
+            local_filename=f["local_filename"], mimetype=f["mimetype"]
+        )
 
     def find_all_files(self, *args, **kwargs):
         return list(self.find_files(*args, **kwargs))
@@ -304,6 +496,14 @@ class ClientSideOcrdMets:
             file_id=ID, page_id=pageId,
             mimetype=mimetype, url=url, local_filename=local_filename
         )
+        if getattr(self._batch, 'files', None) is not None:
+            self._batch.files.append(dict(fileGrp=file_grp, ID=ID, pageId=pageId, mimetype=mimetype, url=url,
+                                    local_filename=local_filename, force=kwargs.get('force', False)))
+            return ClientSideOcrdFile(
+                None, fileGrp=file_grp,
+                ID=ID, pageId=pageId,
+                url=url, mimetype=mimetype, local_filename=local_filename
+            )
         # add force+ignore
         kwargs = {**kwargs, **data.dict()}
 
@@ -322,6 +522,62 @@ class ClientSideOcrdMets:
             url=url, mimetype=mimetype, local_filename=local_filename
         )
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer all :py:meth:`add_file` calls within this context (in the
+        current thread), and add those files in a single :py:meth:`add_files`
+        request at its end (unless the context is left by an exception).
+        """
+        if getattr(self._batch, 'files', None) is not None:
+            # already batching
+            yield
+            return
+        self._batch.files = []
+        try:
+            yield
+            files = self._batch.files
+        finally:
+            self._batch.files = None
+        if files:
+            self.add_files(files)
+
+    def add_files(self, files: List[Dict]) -> List[ClientSideOcrdFile]:
+        """
+        Add multiple files in a single request. Each entry of :py:attr:`files` holds
+        the keyword arguments of :py:meth:`add_file` (with ``fileGrp`` or ``file_grp``).
+        Files are added in order; if one fails, none of them are added.
+        """
+        data = OcrdFileAddListModel(
+            files=[
+                OcrdFileAddModel(
+                    # translate from native OcrdMets kwargs to OcrdMetsServer REST params
+                    file_grp=f.get("fileGrp", f.get("file_grp")), file_id=f.get("ID"), page_id=f.get("pageId"),
+                    mimetype=f.get("mimetype"), url=f.get("url"),
+                    local_filename=str(f["local_filename"]) if f.get("local_filename") else None,
+                    force=f.get("force", False)
+                ) for f in files
+            ]
+        )
+
+        if not self.multiplexing_mode:
+            r = self.session.request("POST", f"{self.url}/files", json=data.dict())
+        else:
+            r = self.session.request("POST", self.url, json=MpxReq.add_files(self.ws_dir_path, data.dict()))
+        if not r.ok:
+            raise RuntimeError(f"Failed to add files ({len(files)}): {r.text}")
+        response = self._decode(r)
+        if "error" in response:
+            raise RuntimeError(f"Failed to add files ({len(files)}): {response}")
+
+        return [
+            ClientSideOcrdFile(
+                None, fileGrp=f.file_grp,
+                ID=f.file_id, pageId=f.page_id,
+                url=f.url, mimetype=f.mimetype, local_filename=f.local_filename
+            ) for f in data.files
+        ]
+
 
 class MpxReq:
     """This class wraps the request bodies needed for the tcp forwarding
@@ -369,6 +625,11 @@ class MpxReq:
         return MpxReq.__args_wrapper(
             ws_dir_path, method_type="GET", response_type="text", request_url="workspace_path", request_data={})
 
+    @staticmethod
+    def generation(ws_dir_path: str) -> Dict:
+        return MpxReq.__args_wrapper(
+            ws_dir_path, method_type="GET", response_type="text", request_url="generation", request_data={})
+
     @staticmethod
     def physical_pages(ws_dir_path: str) -> Dict:
         return MpxReq.__args_wrapper(
@@ -402,6 +663,12 @@ class MpxReq:
         return MpxReq.__args_wrapper(
             ws_dir_path, method_type="POST", response_type="class", request_url="file", request_data=request_data)
 
+    @staticmethod
+    def add_files(ws_dir_path: str, data: Dict) -> Dict:
+        request_data = {"class": data}
+        return MpxReq.__args_wrapper(
+            ws_dir_path, method_type="POST", response_type="class", request_url="files", request_data=request_data)
+
 #
 # Server
 #
@@ -413,6 +680,14 @@ class OcrdMetsServer:
         self.url = url
         self.is_uds = not (url.startswith('http://') or url.startswith('https://'))
         self.log = getLogger(f'ocrd.models.ocrd_mets.server.{self.url}')
+        # incremented on every modification, for client-side cache validation
+        self.generation = 0
+        # number of modifications not yet written to disk (and time of the first one)
+        self.dirty = 0
+        self._dirty_since = None
+        # serializes modifications and saving, notified on modification
+        self._mets_lock = Condition()
+        self._stopping = False
 
     @staticmethod
     def create_process(mets_server_url: str, ws_dir_path: str, log_file: str) -> int:
@@ -445,16 +720,80 @@ class OcrdMetsServer:
                 self.log.warning(f"Due to a server shutdown, removing the existing UDS socket file: {self.url}")
                 Path(self.url).unlink()
 
+    @staticmethod
+    def negotiate(request: Request, response: Union[BaseModel, Dict]) -> Union[BaseModel, Dict, Response]:
+        """
+        Encode a structured response as msgpack if the client accepts it,
+        otherwise leave it to FastAPI's default JSON encoding.
+        """
+        if MSGPACK_MEDIA_TYPE in request.headers.get('accept', ''):
+            if isinstance(response, BaseModel):
+                response = response.dict()
+            return Response(content=msgpack.packb(response), media_type=MSGPACK_MEDIA_TYPE)
+        return response
+
+    def _modified(self):
+        """
+        Account for a modification of the METS (while holding ``_mets_lock``)
+        """
+        self.generation += 1
+        if not self.dirty:
+            self._dirty_since = monotonic()
+        self.dirty += 1
+        self._mets_lock.notify()
+
+    def save(self):
+        """
+        Write the current state of the METS to the file system
+        """
+        with self._mets_lock:
+            self.workspace.save_mets()
+            self.dirty = 0
+
+    def _write_behind(self, interval: float, mutations: int):
+        """
+        Save in the background as soon as ``mutations`` modifications have accumulated
+        or ``interval`` seconds have passed since the first unsaved modification.
+        """
+        with self._mets_lock:
+            while not self._stopping:
+                timeout = None
+                if self.dirty:
+                    if mutations and self.dirty >= mutations:
+                        timeout = 0
+                    elif interval:
+                        timeout = max(0, self._dirty_since + interval - monotonic())
+                if timeout != 0:
+                    self._mets_lock.wait(timeout)
+                    continue
+                self.log.debug(f"Saving {self.dirty} modifications in the background")
+                try:
+                    self.save()
+                except Exception as err:
+                    self.log.exception(f"Failed saving in the background: {err}")
+                    # retry later
+                    self._dirty_since = monotonic()
+                    self._mets_lock.wait(interval or 1.0)
+
     def startup(self):
         self.log.info(f"Configuring the Mets Server")
 
         workspace = self.workspace
+        negotiate = self.negotiate
 
         app = FastAPI(
             title="OCR-D METS Server",
             description="Providing simultaneous write-access to mets.xml for OCR-D",
         )
 
+        @app.middleware('http')
+        async def generation_header(request: Request, call_next):
+            # as of before handling, so results are at least as recent
+            generation = self.generation
+            response = await call_next(request)
+            response.headers[GENERATION_HEADER] = str(generation)
+            return response
+
         @app.exception_handler(ValidationError)
         async def exception_handler_validation_error(request: Request, exc: ValidationError):
             return JSONResponse(status_code=400, content=exc.errors())
@@ -472,7 +811,7 @@ class OcrdMetsServer:
             """
             Write current changes to the file system
             """
-            workspace.save_mets()
+            self.save()
             response = Response(content="The Mets Server is writing changes to disk.", media_type='text/plain')
             self.log.debug(f"PUT / -> {response.__dict__}")
             return response
@@ -482,7 +821,7 @@ class OcrdMetsServer:
             """
             Stop the mets server
             """
-            workspace.save_mets()
+            self.save()
             response = Response(content="The Mets Server will shut down soon...", media_type='text/plain')
             self.shutdown()
             self.log.debug(f"DELETE / -> {response.__dict__}")
@@ -493,14 +832,22 @@ class OcrdMetsServer:
             """
             Reload mets file from the file system
             """
-            workspace.reload_mets()
+            with self._mets_lock:
+                workspace.reload_mets()
+                self.generation += 1
+                # unsaved modifications are discarded
+                self.dirty = 0
             response = Response(content=f"Reloaded from {workspace.directory}", media_type='text/plain')
             self.log.debug(f"POST /reload -> {response.__dict__}")
             return response
 
+        # handlers accessing the METS are synchronous (i.e. run in the threadpool),
+        # so waiting for the lock (e.g. while saving) does not block the event loop
+
         @app.get(path='/unique_identifier', response_model=str)
-        async def unique_identifier():
-            response = Response(content=workspace.mets.unique_identifier, media_type='text/plain')
+        def unique_identifier():
+            with self._mets_lock:
+                response = Response(content=workspace.mets.unique_identifier, media_type='text/plain')
             self.log.debug(f"GET /unique_identifier -> {response.__dict__}")
             return response
 
@@ -510,39 +857,52 @@ class OcrdMetsServer:
             self.log.debug(f"GET /workspace_path -> {response.__dict__}")
             return response
 
+        @app.get(path='/generation', response_model=str)
+        async def generation():
+            response = Response(content=str(self.generation), media_type='text/plain')
+            self.log.debug(f"GET /generation -> {response.__dict__}")
+            return response
+
         @app.get(path='/physical_pages', response_model=OcrdPageListModel)
-        async def physical_pages():
-            response = {'physical_pages': workspace.mets.physical_pages}
+        def physical_pages(request: Request):
+            with self._mets_lock:
+                response = {'physical_pages': workspace.mets.physical_pages}
             self.log.debug(f"GET /physical_pages -> {response}")
-            return response
+            return negotiate(request, response)
 
         @app.get(path='/physical_pages', response_model=OcrdPageListModel)
-        async def physical_pages():
-            return {'physical_pages': workspace.mets.physical_pages}
+        def physical_pages():
+            with self._mets_lock:
+                return {'physical_pages': workspace.mets.physical_pages}
 
         @app.get(path='/file_groups', response_model=OcrdFileGroupListModel)
-        async def file_groups():
-            response = {'file_groups': workspace.mets.file_groups}
+        def file_groups(request: Request):
+            with self._mets_lock:
+                response = {'file_groups': workspace.mets.file_groups}
             self.log.debug(f"GET /file_groups -> {response}")
-            return response
+            return negotiate(request, response)
 
         @app.get(path='/agent', response_model=OcrdAgentListModel)
-        async def agents():
-            response = OcrdAgentListModel.create(workspace.mets.agents)
+        def agents(request: Request):
+            with self._mets_lock:
+                response = OcrdAgentListModel.create(workspace.mets.agents)
             self.log.debug(f"GET /agent -> {response.__dict__}")
-            return response
+            return negotiate(request, response)
 
         @app.post(path='/agent', response_model=OcrdAgentModel)
-        async def add_agent(agent: OcrdAgentModel):
+        def add_agent(agent: OcrdAgentModel):
             kwargs = agent.dict()
             kwargs['_type'] = kwargs.pop('type')
-            workspace.mets.add_agent(**kwargs)
+            with self._mets_lock:
+                workspace.mets.add_agent(**kwargs)
+                self._modified()
             response = agent
             self.log.debug(f"POST /agent -> {response.__dict__}")
             return response
 
         @app.get(path="/file", response_model=OcrdFileListModel)
-        async def find_files(
+        def find_files(
+            request: Request,
             file_grp: Optional[str] = None,
             file_id: Optional[str] = None,
             page_id: Optional[str] = None,
@@ -553,15 +913,67 @@ class OcrdMetsServer:
             """
             Find files in the mets
             """
-            found = workspace.mets.find_all_files(
+            with self._mets_lock:
+                found = workspace.mets.find_all_files(
+                    fileGrp=file_grp, ID=file_id, pageId=page_id, mimetype=mimetype, local_filename=local_filename, url=url
+                )
+                # resolve all page IDs in one pass
+                page_ids = workspace.mets.get_physical_pages_for_files(f.ID for f in found)
+                response = OcrdFileListModel.create(found, page_ids)
+            self.log.debug(f"GET /file -> {response.__dict__}")
+            return negotiate(request, response)
+
+        @app.get(path="/file/stream")
+        def find_files_stream(
+            request: Request,
+            file_grp: Optional[str] = None,
+            file_id: Optional[str] = None,
+            page_id: Optional[str] = None,
+            mimetype: Optional[str] = None,
+            local_filename: Optional[str] = None,
+            url: Optional[str] = None
+        ):
+            """
+            Find files in the mets, responding with one JSON object per line
+            (or with concatenated msgpack objects if the client accepts that)
+            """
+            found = workspace.mets.find_files(
                 fileGrp=file_grp, ID=file_id, pageId=page_id, mimetype=mimetype, local_filename=local_filename, url=url
             )
-            response = OcrdFileListModel.create(found)
-            self.log.debug(f"GET /file -> {response.__dict__}")
-            return response
+            use_msgpack = MSGPACK_MEDIA_TYPE in request.headers.get('accept', '')
+
+            def chunks():
+                # (the files' attributes are read from the tree)
+                while True:
+                    with self._mets_lock:
+                        files = list(islice(found, FIND_FILES_STREAM_CHUNK_SIZE))
+                        page_ids = workspace.mets.get_physical_pages_for_files(f.ID for f in files)
+                        models = [OcrdFileModel.create(
+                            file_grp=f.fileGrp, file_id=f.ID, mimetype=f.mimetype, page_id=page_ids[f.ID], url=f.url,
+                            local_filename=f.local_filename
+                        ) for f in files]
+                    if not models:
+                        return
+                    yield models
+
+            chunks = chunks()
+            # search before responding so invalid queries still yield status 400
+            first = next(chunks, [])
+            self.log.debug(f"GET /file/stream -> {len(first)} files in first chunk")
+
+            # (iterated in the threadpool by StreamingResponse)
+            def serialize():
+                for models in chain([first], chunks):
+                    if use_msgpack:
+                        yield b''.join(msgpack.packb(model.dict()) for model in models)
+                    else:
+                        yield ''.join(model.json() + '\n' for model in models)
+            if use_msgpack:
+                return StreamingResponse(serialize(), media_type=MSGPACK_MEDIA_TYPE)
+            return StreamingResponse(serialize(), media_type='application/x-ndjson')
 
         @app.post(path='/file', response_model=OcrdFileModel)
-        async def add_file(
+        def add_file(
             file_grp: str = Form(),
             file_id: str = Form(),
             page_id: Optional[str] = Form(None),
@@ -580,11 +992,53 @@ class OcrdMetsServer:
             )
             # Add to workspace
             kwargs = file_resource.dict()
-            workspace.add_file(**kwargs, force=force)
+            with self._mets_lock:
+                workspace.add_file(**kwargs, force=force)
+                self._modified()
             response = file_resource
             self.log.debug(f"POST /file -> {response.__dict__}")
             return response
 
+        @app.post(path='/files', response_model=OcrdFileListModel)
+        def add_files(request: Request, files: OcrdFileAddListModel):
+            """
+            Add multiple files (in order, and either all or none)
+            """
+            added = []
+            with self._mets_lock:
+                # how to revert each file added so far (and the file it replaced, if any)
+                undo = []
+                file_groups = set(workspace.mets.file_groups)
+                try:
+                    for file_resource in files.files:
+                        kwargs = file_resource.dict()
+                        force = kwargs.pop('force')
+                        replaced = None
+                        if force:
+                            replaced = next(workspace.mets.find_files(ID=kwargs['file_id'], fileGrp=kwargs['file_grp']), None)
+                        if replaced:
+                            replaced = dict(ID=replaced.ID, pageId=replaced.pageId, mimetype=replaced.mimetype,
+                                            url=replaced.url or None, local_filename=replaced.local_filename)
+                        workspace.add_file(**kwargs, force=force)
+                        undo.append((kwargs['file_id'], kwargs['file_grp'], replaced))
+                        added.append(OcrdFileModel(**kwargs))
+                except Exception:
+                    for file_id, file_grp, replaced in reversed(undo):
+                        workspace.mets.remove_one_file(file_id, fileGrp=file_grp)
+                        if replaced:
+                            workspace.mets.add_file(file_grp, **replaced)
+                    for file_grp in set(workspace.mets.file_groups) - file_groups:
+                        workspace.mets.remove_file_group(file_grp)
+                    if undo:
+                        # (replaced files were re-added at the end)
+                        self._modified()
+                    raise
+                for _ in added:
+                    self._modified()
+            response = OcrdFileListModel(files=added)
+            self.log.debug(f"POST /files -> {len(added)} files")
+            return negotiate(request, response)
+
         # ------------- #
 
         if self.is_uds:
@@ -602,5 +1056,23 @@ class OcrdMetsServer:
         uvicorn_kwargs['log_config'] = None
         uvicorn_kwargs['access_log'] = False
 
+        interval = config.OCRD_METS_SERVER_SAVE_INTERVAL
+        mutations = config.OCRD_METS_SERVER_SAVE_MUTATIONS
+        if interval > 0 or mutations > 0:
+            self.log.info(f"Saving changes in the background (interval: {interval}s, mutations: {mutations})")
+            write_behind = Thread(target=self._write_behind, args=(interval, mutations), daemon=True)
+            write_behind.start()
+
+            def stop_write_behind():
+                with self._mets_lock:
+                    self._stopping = True
+                    self._mets_lock.notify()
+                write_behind.join()
+                if self.dirty:
+                    self.log.info(f"Saving {self.dirty} remaining modifications")
+                    self.save()
+            # uvicorn re-raises the termination signal after shutdown, so save during shutdown
+            app.add_event_handler('shutdown', stop_write_behind)
+
         self.log.info("Starting the uvicorn Mets Server")
         uvicorn.run(app, **uvicorn_kwargs)
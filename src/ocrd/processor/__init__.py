@@ -9,6 +9,11 @@ from .ocrd_page_result import (
     OcrdPageResult,
     OcrdPageResultImage
 )
+from .progress import ProcessingProgress
+from .shared import (
+    share_array,
+    share_file,
+)
 from .helpers import (
     run_cli,
     run_processor,
@@ -9,27 +9,33 @@ __all__ = [
     'run_processor'
 ]
 
-from functools import cached_property
+from functools import cached_property, partial
 from os.path import exists, join
 from shutil import copyfileobj
+import gc
 import json
 import os
 from os import getcwd
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union, get_args
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union, get_args
 import sys
 import logging
 import logging.handlers
 import inspect
 import tarfile
 import io
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from queue import Empty, SimpleQueue
+from time import time
 from frozendict import frozendict
 # concurrent.futures is buggy in py38,
 # this is where the fixes came from:
 from loky import Future, ProcessPoolExecutor
+from loky.process_executor import BrokenProcessPool, ShutdownExecutorError
 import multiprocessing as mp
-from threading import Timer
+from threading import RLock, Timer, current_thread, main_thread
 from _thread import interrupt_main
 
 from click import wrap_text
@@ -38,14 +44,19 @@ from requests import HTTPError
 
 from ..workspace import Workspace
 from ..mets_server import ClientSideOcrdMets
-from ocrd_models.ocrd_file import OcrdFileType
+from ocrd_models.ocrd_file import OcrdFile, ClientSideOcrdFile, OcrdFileType
+from ocrd_models.ocrd_mets import RecordingOcrdMets, SynchronizedOcrdMets
 from .ocrd_page_result import OcrdPageResult
+from .progress import ProcessingProgress
+from .shared import share_file
 from ocrd_utils import (
     VERSION as OCRD_VERSION,
     MIMETYPE_PAGE,
     MIME_TO_EXT,
     config,
     getLogger,
+    get_local_filename,
+    is_local_filename,
     list_resource_candidates,
     pushd_popd,
     list_all_resources,
@@ -56,15 +67,7 @@ from ocrd_utils import (
     deprecation_warning
 )
 from ocrd_validators import ParameterValidator
-from ocrd_models.ocrd_page import (
-    PageType,
-    AlternativeImageType,
-    MetadataItemType,
-    LabelType,
-    LabelsType,
-    OcrdPage,
-    to_xml,
-)
+from ocrd_models.ocrd_page import OcrdPage, to_xml
 from ocrd_modelfactory import page_from_file
 from ocrd_validators.ocrd_tool_validator import OcrdToolValidator
 
@@ -131,12 +134,172 @@ class DummyExecutor:
         initializer(*initargs)
     def shutdown(self, **kwargs):
         # allow gc to catch processor instance (unless cached)
-        _page_worker_set_ctxt(None, None)
+        _page_worker_set_ctxt(None, None, None)
     def submit(self, fn, *args, **kwargs) -> DummyFuture:
         return DummyFuture(fn, *args, **kwargs)
 
+class PageStartTracker:
+    """
+    Mixin for executors whose page workers send the pageId and time
+    when they start processing a page to `start_queue`, so
+    :py:meth:`.overdue` can tell which pages are taking too long.
+    """
+    start_queue = None
+    def _update_started(self):
+        while self.start_queue:
+            try:
+                page_id, start_time = self.start_queue.get_nowait()
+            except Empty:
+                break
+            self._started[page_id] = start_time
+    def overdue(self, tasks : Dict[Future, Tuple[str, Any]], max_seconds : float) -> List[Future]:
+        """
+        Return those of the pending `tasks` (mapped to their pageId)
+        which have been running for more than `max_seconds`
+        """
+        self._update_started()
+        now = time()
+        return [task for task, (page_id, _) in tasks.items()
+                if not task.done() and now - self._started.get(page_id, now) > max_seconds]
+
+class PageWorkerPool(PageStartTracker):
+    """
+    Mimics some of `concurrent.futures.ProcessPoolExecutor` by delegating
+    to a `loky.ProcessPoolExecutor`, which gets replaced by a fresh one
+
+    - after `max_pages` submissions per worker (if positive), as soon as
+      the old workers have finished their pending pages (to contain memory
+      growth) - further submissions are held back until then,
+    - on :py:meth:`.kill` (to get rid of workers stuck on a page).
+
+    (So there is only ever one set of at most `max_workers` workers.)
+    """
+    def __init__(self, max_workers=1, context=None, initializer=None, initargs=(), max_pages=0, start_queue=None):
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.start_queue = start_queue
+        self._started = {}
+        self._executor_kwargs = dict(max_workers=max_workers, context=context,
+                                     initializer=initializer, initargs=initargs)
+        # submissions held back while the current workers drain
+        self._backlog = []
+        # (done callbacks run in the executor's manager thread)
+        self._lock = RLock()
+        self._start()
+    def _start(self):
+        self._executor = ProcessPoolExecutor(**self._executor_kwargs)
+        self._nr_submitted = 0
+        # futures of the current executor which are not done yet
+        self._running = set()
+    def __str__(self):
+        return f"PageWorkerPool({self._executor})"
+    def _exhausted(self):
+        return self.max_pages > 0 and self._nr_submitted >= self.max_pages * self.max_workers
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._backlog or self._exhausted():
+                task = Future()
+                self._backlog.append((task, fn, args, kwargs))
+                self._recycle_if_drained()
+                return task
+            return self._submit(fn, args, kwargs)
+    def _submit(self, fn, args, kwargs) -> Future:
+        self._nr_submitted += 1
+        task = self._executor.submit(fn, *args, **kwargs)
+        self._running.add(task)
+        task.add_done_callback(partial(self._task_done, self._executor))
+        return task
+    def _task_done(self, executor, task):
+        with self._lock:
+            if executor is not self._executor:
+                # killed already
+                return
+            self._running.discard(task)
+            self._recycle_if_drained()
+    def _recycle_if_drained(self):
+        if self._running or not self._exhausted():
+            return
+        self._executor.shutdown(wait=False)
+        self._start()
+        while self._backlog and not self._exhausted():
+            task, fn, args, kwargs = self._backlog.pop(0)
+            if task.set_running_or_notify_cancel():
+                self._submit(fn, args, kwargs).add_done_callback(partial(_copy_future_state, task))
+    def kill(self) -> Set[str]:
+        """
+        Kill all workers (failing their pending pages, including those
+        held back) and start new ones.
+
+        Returns the pageIds of all pages which had been started.
+        """
+        with self._lock:
+            self._executor.shutdown(wait=False, kill_workers=True)
+            running, backlog = self._running, self._backlog
+            self._backlog = []
+            self._start()
+        for task, _, _, _ in backlog:
+            if task.set_running_or_notify_cancel():
+                task.set_exception(ShutdownExecutorError("page was held back when the workers were killed"))
+        # (the executor fails its pending futures asynchronously)
+        wait(running, timeout=PAGE_WORKER_KILL_GRACE)
+        self._update_started()
+        started = set(self._started)
+        self._started.clear()
+        return started
+    @staticmethod
+    def completed(task : Future) -> bool:
+        """
+        Whether `task` has run to completion (successfully or not),
+        as opposed to being pending or failed by :py:meth:`.kill`.
+        """
+        return (task.done() and not task.cancelled() and
+                not isinstance(task.exception(), (ShutdownExecutorError, BrokenProcessPool)))
+    def shutdown(self, **kwargs):
+        with self._lock:
+            for task, _, _, _ in self._backlog:
+                task.cancel()
+            self._backlog = []
+            self._executor.shutdown(**kwargs)
+
+def _copy_future_state(target : Future, source : Future):
+    if source.cancelled():
+        target.set_exception(CancelledError())
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+class PageThreadPool(PageStartTracker):
+    """
+    Mimics some of :py:class:`PageWorkerPool` by delegating to a
+    `concurrent.futures.ThreadPoolExecutor`, i.e. runs pages in threads
+    of this process, all sharing the same processor instance.
+
+    (Threads cannot be interrupted or killed, so pages exceeding the
+    timeout can only be given up on.)
+    """
+    def __init__(self, max_workers=1, initializer=None, initargs=(), start_queue=None, **kwargs):
+        initializer(*initargs)
+        self.start_queue = start_queue
+        self._started = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ocrd-page')
+    def __str__(self):
+        return f"PageThreadPool({self._executor})"
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return self._executor.submit(fn, *args, **kwargs)
+    def shutdown(self, wait=True, **kwargs):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        # allow gc to catch processor instance (unless cached)
+        _page_worker_set_ctxt(None, None, None)
+
 TFuture = Union[DummyFuture, Future]
-TExecutor = Union[DummyExecutor, ProcessPoolExecutor]
+TExecutor = Union[DummyExecutor, PageWorkerPool, PageThreadPool]
+
+PAGE_WORKER_KILL_GRACE = 5
+"""
+Number of seconds beyond the page timeout before a page worker
+(which could not be interrupted) gets killed.
+"""
 
 class Processor():
     """
@@ -178,6 +341,24 @@ class Processor():
     or complexity of the page.)
     """
 
+    parallel_threads : bool = False
+    """
+    whether page-parallel processing should use threads (sharing this instance and
+    the workspace) instead of processor forks (otherwise ignored, cf. :py:data:`max_workers`).
+
+    (Override this if your class spends most of its time in code which releases the GIL,
+    like NumPy, OpenCV or ONNX Runtime, and does not modify its own state when processing
+    pages - especially if its models are too large to be duplicated across forks.)
+    """
+
+    progress_callback : Optional[Callable[[ProcessingProgress], None]] = None
+    """
+    optional hook to be called with the current :py:class:`~ocrd.processor.progress.ProcessingProgress`
+    whenever a page has been handled during :py:meth:`.process_workspace`.
+
+    (Set this to monitor progress on long runs, e.g. to feed metrics of a scheduler.)
+    """
+
     @property
     def metadata_filename(self) -> str:
         """
@@ -295,6 +476,7 @@ class Processor():
         # make parameter dict read-only
         self._parameter = frozendict(parameter)
         # (re-)run setup to load models etc
+        self._shared_setup = False
         self.setup()
 
     def __init__(
@@ -456,6 +638,22 @@ class Processor():
         """
         pass
 
+    def setup_shared(self) -> None:
+        """
+        Prepare the processor for sharing its state with forked
+        page workers, after :py:meth:`.setup` but prior to starting
+        workers in :py:meth:`.process_workspace` (only once per setup).
+
+        Forked workers inherit all memory copy-on-write, but as soon
+        as they touch Python objects, pages get copied, so every worker
+        ends up with its own copy of the models.
+
+        (Override this to move large read-only arrays into shared memory
+        via :py:func:`~ocrd.processor.shared.share_array`, or to (re)load
+        resources from files mapped via :py:meth:`.share_resource`.)
+        """
+        pass
+
     def shutdown(self) -> None:
         """
         Bring down the processor after data processing,
@@ -505,41 +703,77 @@ class Processor():
                 if self.max_workers > 0 and self.max_workers < config.OCRD_MAX_PARALLEL_PAGES:
                     self._base_logger.info("limiting number of workers from %d to %d", max_workers, self.max_workers)
                     max_workers = self.max_workers
-                if max_workers > 1:
-                    assert isinstance(workspace.mets, ClientSideOcrdMets), \
-                        "OCRD_MAX_PARALLEL_PAGES>1 requires also using --mets-server-url"
+                threads = max_workers > 1 and self.parallel_threads
+                # without METS Server, forks send their METS changes back to this process
+                record_mets = max_workers > 1 and not threads and not isinstance(workspace.mets, ClientSideOcrdMets)
                 max_seconds = max(0, config.OCRD_PROCESSING_PAGE_TIMEOUT)
                 if self.max_page_seconds > 0 and self.max_page_seconds < config.OCRD_PROCESSING_PAGE_TIMEOUT:
                     self._base_logger.info("limiting page timeout from %d to %d sec", max_seconds, self.max_page_seconds)
                     max_seconds = self.max_page_seconds
 
+                # bound the number of pages submitted at a time
+                max_pending = max(0, config.OCRD_MAX_PENDING_PAGES)
                 if max_workers > 1:
-                    executor_cls = ProcessPoolExecutor
+                    max_pending = max(max_pending or 2 * max_workers, max_workers)
+                else:
+                    # runs upon waiting for result anyway
+                    max_pending = 1
+
+                if threads:
+                    executor_cls = PageThreadPool
+                    log_queue = None
+                    # for watchdog on timeout
+                    start_queue = SimpleQueue() if max_seconds > 0 else None
+                    if not isinstance(workspace.mets, ClientSideOcrdMets):
+                        # share local METS between threads
+                        workspace.mets = SynchronizedOcrdMets(workspace.mets)
+                elif max_workers > 1:
+                    executor_cls = PageWorkerPool
+                    if not getattr(self, '_shared_setup', False):
+                        self.setup_shared()
+                        self._shared_setup = True
+                    # keep gc in workers from touching (i.e. copying) inherited objects
+                    gc.freeze()
                     log_queue = mp.get_context('fork').Queue()
+                    # for watchdog on timeout
+                    start_queue = mp.get_context('fork').Queue() if max_seconds > 0 else None
                 else:
                     executor_cls = DummyExecutor
                     log_queue = None
+                    start_queue = None
                 executor = executor_cls(
                     max_workers=max_workers or 1,
                     # only forking method avoids pickling
                     context=mp.get_context('fork'),
                     # share processor instance as global to avoid pickling
                     initializer=_page_worker_set_ctxt,
-                    initargs=(self, log_queue),
+                    initargs=(self, log_queue, start_queue, record_mets),
+                    max_pages=max(0, config.OCRD_MAX_PAGES_PER_WORKER),
+                    start_queue=start_queue,
                 )
-                if max_workers > 1:
+                if log_queue:
                     # forward messages from log queue (in subprocesses) to all root handlers
                     log_listener = logging.handlers.QueueListener(log_queue, *logging.root.handlers, respect_handler_level=True)
                     log_listener.start()
                 tasks = None
+                input_file_tuples = None
                 try:
                     self._base_logger.debug("started executor %s with %d workers", str(executor), max_workers or 1)
-                    tasks = self.process_workspace_submit_tasks(executor, max_seconds)
-                    stats = self.process_workspace_handle_tasks(tasks)
+                    input_file_tuples = self.zip_input_files(on_error='abort', require_first=False)
+                    tasks = self.process_workspace_submit_tasks(executor, max_seconds, input_file_tuples, max_pending)
+                    stats = self.process_workspace_handle_tasks(tasks, len(input_file_tuples))
                 finally:
+                    if tasks:
+                        # stop submitting (in case of early failure)
+                        tasks.close()
                     executor.shutdown(kill_workers=True, wait=False)
-                    self._base_logger.debug("stopped executor %s after %d tasks", str(executor), len(tasks) if tasks else -1)
-                    if max_workers > 1:
+                    self._base_logger.debug("stopped executor %s after %d tasks", str(executor),
+                                            len(input_file_tuples) if input_file_tuples is not None else -1)
+                    if isinstance(workspace.mets, SynchronizedOcrdMets):
+                        workspace.mets = workspace.mets.mets
+                    if isinstance(executor, PageWorkerPool):
+                        gc.unfreeze()
+                    if log_queue:
                         # can cause deadlock:
                         #log_listener.stop()
                         # not much better:
@@ -554,38 +788,226 @@ class Processor():
                     # suppress the NotImplementedError context
                     raise err from None
 
-    def process_workspace_submit_tasks(self, executor : TExecutor, max_seconds : int) -> Dict[TFuture, Tuple[str, List[Optional[OcrdFileType]]]]:
+    def process_workspace_submit_tasks(
+            self,
+            executor : TExecutor,
+            max_seconds : int,
+            input_file_tuples : List[List[Optional[OcrdFileType]]],
+            max_pending : int = 1,
+    ) -> Iterator[Tuple[TFuture, str, List[Optional[OcrdFileType]]]]:
         """
-        Look up all input files of the given ``workspace``
+        Given all input files of the given ``workspace``
         from the given :py:data:`input_file_grp`
         for the given :py:data:`page_id` (or all pages),
-        and schedules calling :py:meth:`.process_page_file`
+        as looked up by :py:meth:`.zip_input_files`,
+        schedules calling :py:meth:`.process_page_file`
         on them for each page via `executor` (enforcing
-        a per-page time limit of `max_seconds`).
-
-        When running with `OCRD_MAX_PARALLEL_PAGES>1` and
-        the workspace via METS Server, the executor will fork
-        this many worker parallel subprocesses each processing
-        one page at a time. (Interprocess communication is
-        done via task and result queues.)
+        a per-page time limit of `max_seconds`), keeping
+        at most `max_pending` pages submitted at a time.
+
+        When running with `OCRD_MAX_PARALLEL_PAGES>1`, the
+        executor will fork this many worker parallel subprocesses
+        each processing one page at a time. (Interprocess
+        communication is done via task and result queues.)
+        Unless the workspace is accessed via METS Server, the
+        workers will return their METS changes along with the
+        results, which are then applied to the local METS here
+        (cf. :py:meth:`.process_workspace_handle_page_task`).
+
+        If :py:data:`parallel_threads` is set, then the executor
+        will instead start this many threads sharing this instance
+        and the workspace (locally or via METS Server).
 
         Otherwise, tasks are run sequentially in the
         current process.
 
-        Delegates to :py:meth:`.zip_input_files` to get 
-        the input files for each page, and then calls
+        Downloads the input files for each page ahead via
+        :py:meth:`.prefetch_input_files`, and then calls
         :py:meth:`.process_workspace_submit_page_task`.
 
-        Returns a dict mapping the per-page tasks
-        (i.e. futures submitted to the executor)
-        to their corresponding pageId and input files.
-        """
-        tasks = {}
-        for input_file_tuple in self.zip_input_files(on_error='abort', require_first=False):
+        Generates the per-page tasks (i.e. futures submitted
+        to the executor) along with their corresponding pageId
+        and input files, in the order of their completion.
+
+        When running with a per-page time limit in worker
+        subprocesses, workers that cannot be interrupted
+        in time (e.g. stuck in C extensions) will be killed
+        after :py:data:`PAGE_WORKER_KILL_GRACE` seconds more:
+        their pages fail with a `TimeoutError`, and all other
+        pending pages get re-submitted to fresh workers
+        (overwriting any partial outputs).
+        (Worker threads are merely given up on instead.)
+        """
+        pending = {}
+        nr_submitted = 0
+        for input_file_tuple in self.prefetch_input_files(input_file_tuples):
             task, page_id, input_files = self.process_workspace_submit_page_task(executor, max_seconds, input_file_tuple)
-            tasks[task] = (page_id, input_files)
-        self._base_logger.debug("submitted %d processing tasks", len(tasks))
-        return tasks
+            pending[task] = (page_id, input_files)
+            nr_submitted += 1
+            while len(pending) >= max_pending:
+                yield from self._pop_completed_tasks(executor, max_seconds, pending)
+        self._base_logger.debug("submitted %d processing tasks", nr_submitted)
+        while pending:
+            yield from self._pop_completed_tasks(executor, max_seconds, pending)
+
+    def _pop_completed_tasks(
+            self,
+            executor : TExecutor,
+            max_seconds : int,
+            pending : Dict[TFuture, Tuple[str, List[Optional[OcrdFileType]]]]
+    ) -> Iterator[Tuple[TFuture, str, List[Optional[OcrdFileType]]]]:
+        if isinstance(executor, PageStartTracker) and executor.start_queue:
+            # watchdog: poll for completion or overdue pages
+            if isinstance(executor, PageWorkerPool):
+                max_seconds_overdue = max_seconds + PAGE_WORKER_KILL_GRACE
+            else:
+                # threads do not get interrupted at all
+                max_seconds_overdue = max_seconds
+            while True:
+                done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                if done:
+                    break
+                overdue = executor.overdue(pending, max_seconds_overdue)
+                if overdue:
+                    done = self._kill_overdue_tasks(executor, max_seconds, pending, overdue)
+                    break
+        elif len(pending) == 1:
+            # no need to wait here (also, DummyFuture only runs when awaited)
+            done = list(pending)
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for task in done:
+            yield (task, *pending.pop(task))
+
+    def _kill_overdue_tasks(
+            self,
+            executor : Union[PageWorkerPool, PageThreadPool],
+            max_seconds : int,
+            pending : Dict[TFuture, Tuple[str, List[Optional[OcrdFileType]]]],
+            overdue : List[TFuture]
+    ) -> List[TFuture]:
+        """
+        Kill all page workers, replace the `overdue` tasks by failed ones,
+        and re-submit all other tasks interrupted by that. Return the failed tasks.
+
+        (Pages which had already been started get re-submitted with
+        ``OCRD_EXISTING_OUTPUT=OVERWRITE``, because their outputs
+        may have been added partially.)
+
+        (For page threads, just replace the `overdue` tasks.)
+        """
+        page_ids = [pending[task][0] for task in overdue]
+        if isinstance(executor, PageWorkerPool):
+            self._base_logger.error("killing page workers stuck beyond timeout on pages %s", page_ids)
+            started = executor.kill()
+            # (some may have completed in the meantime)
+            finished = [task for task in pending if executor.completed(task)]
+        else:
+            self._base_logger.error("giving up on page threads stuck beyond timeout on pages %s", page_ids)
+            started = set()
+            finished = [task for task in pending if task not in overdue]
+        failed = []
+        for task in list(pending):
+            if task in finished:
+                continue
+            page_id, input_files = pending.pop(task)
+            if task in overdue:
+                task = Future()
+                task.set_exception(TimeoutError(f"page {page_id} exceeded {max_seconds}s and had to be given up"))
+                failed.append(task)
+            else:
+                self._base_logger.info("re-submitting page %s", page_id)
+                task = executor.submit(_page_worker, max_seconds, *_page_worker_files(executor, input_files),
+                                       overwrite=page_id in started)
+            pending[task] = (page_id, input_files)
+        return failed
+
+    def prefetch_input_files(self, input_file_tuples : Iterable[List[Optional[OcrdFileType]]]) -> Iterator[List[Optional[OcrdFileType]]]:
+        """
+        Pass through the given per-page ``input_file_tuples``,
+        but download their files concurrently up to
+        `OCRD_PROCESSING_PREFETCH_PAGES` pages ahead
+        (in a pool of as many threads).
+
+        Yields each page's input files as soon as they are
+        downloaded (in the original order of pages).
+
+        (Downloads that fail here are merely logged, so they
+        will be retried and reported by
+        :py:meth:`.process_workspace_submit_page_task`.)
+        """
+        depth = max(0, config.OCRD_PROCESSING_PREFETCH_PAGES)
+        if not depth or not self.download:
+            yield from input_file_tuples
+            return
+        # (downloading threads must not depend on the working directory)
+        directory = str(Path(self.workspace.directory).absolute())
+        with ThreadPoolExecutor(max_workers=depth, thread_name_prefix='ocrd-prefetch') as downloader:
+            pending = deque()
+            for input_file_tuple in input_file_tuples:
+                downloads = self._prefetch_page_downloads(directory, input_file_tuple)
+                pending.append((downloader.submit(self._prefetch_page_files, directory, downloads), input_file_tuple))
+                if len(pending) > depth:
+                    yield self._prefetched_page_files(*pending.popleft())
+            while pending:
+                yield self._prefetched_page_files(*pending.popleft())
+
+    def _prefetch_page_downloads(self, directory : str, input_file_tuple : List[Optional[OcrdFileType]]) -> List[Tuple[OcrdFileType, str, Dict[str, Any]]]:
+        """
+        Determine how to download the given input files to the workspace
+        `directory` like :py:meth:`ocrd.Workspace.download_file` would, i.e.
+        the file, the URL and the keyword arguments to
+        :py:meth:`ocrd.Resolver.download_to_directory` for each.
+
+        (Files already in the workspace, or only available under a relative path,
+        are left to :py:meth:`ocrd.Workspace.download_file` in the main thread.)
+        """
+        downloads = []
+        for input_file in input_file_tuple:
+            if input_file is None:
+                continue
+            local_filename = input_file.local_filename
+            url = input_file.url
+            if not url and local_filename and self.workspace.baseurl:
+                url = '%s/%s' % (self.workspace.baseurl, local_filename)
+            if not url or is_local_filename(url) and not Path(get_local_filename(url)).is_absolute():
+                continue
+            if local_filename:
+                if Path(directory, local_filename).exists():
+                    continue
+                path = Path(local_filename)
+                downloads.append((input_file, url, dict(subdir=path.parent, basename=path.name)))
+            elif input_file.ID:
+                basename = '%s%s' % (input_file.ID, MIME_TO_EXT.get(input_file.mimetype, ''))
+                downloads.append((input_file, url, dict(subdir=input_file.fileGrp, basename=basename)))
+        return downloads
+
+    def _prefetch_page_files(self, directory : str, downloads : List[Tuple[OcrdFileType, str, Dict[str, Any]]]) -> List[Tuple[OcrdFileType, str]]:
+        """
+        Run the `downloads` (in a prefetching thread, so without changing the
+        working directory or the input files themselves).
+
+        Returns each downloaded input file along with its ``local_filename``.
+        """
+        downloaded = []
+        for input_file, url, kwargs in downloads:
+            try:
+                local_filename = self.workspace.resolver.download_to_directory(directory, url, **kwargs)
+            except (ValueError, FileNotFoundError, HTTPError) as e:
+                self._base_logger.debug(f"failed prefetching file {input_file}: {e!r}")
+                continue
+            downloaded.append((input_file, local_filename))
+        return downloaded
+
+    def _prefetched_page_files(self, download : Future, input_file_tuple : List[Optional[OcrdFileType]]) -> List[Optional[OcrdFileType]]:
+        """
+        Wait for the `download` of a page's input files, then (in the
+        main thread) update their ``local_filename`` in the METS.
+        """
+        for input_file, local_filename in download.result():
+            if not input_file.local_filename:
+                input_file.local_filename = local_filename
+        return input_file_tuple
 
     def process_workspace_submit_page_task(self, executor : TExecutor, max_seconds : int, input_file_tuple : List[Optional[OcrdFileType]]) -> Tuple[TFuture, str, List[Optional[OcrdFileType]]]:
         """
@@ -624,12 +1046,14 @@ class Processor():
                 self._base_logger.warning(f"failed downloading file {input_file} for page {page_id}")
         # process page
         #executor.submit(self.process_page_file, *input_files)
-        return executor.submit(_page_worker, max_seconds, *input_files), page_id, input_files
+        return executor.submit(_page_worker, max_seconds, *_page_worker_files(executor, input_files)), page_id, input_files
 
-    def process_workspace_handle_tasks(self, tasks : Dict[TFuture, Tuple[str, List[Optional[OcrdFileType]]]]) -> Tuple[int, int, Dict[str, int], int]:
+    def process_workspace_handle_tasks(self, tasks : Iterable[Tuple[TFuture, str, List[Optional[OcrdFileType]]]], nr_pages : int) -> Tuple[int, int, Dict[str, int], int]:
         """
-        Look up scheduled per-page futures one by one,
-        handle errors (exceptions) and gather results.
+        Look up scheduled per-page futures one by one
+        (as generated by :py:meth:`.process_workspace_submit_tasks`
+        for a total of `nr_pages`), handle errors (exceptions)
+        and gather results.
 
         \b
         Enforces policies configured by the following
@@ -646,39 +1070,59 @@ class Processor():
         - the number of total requested pages (i.e. success+fail+existing).
 
         Delegates to :py:meth:`.process_workspace_handle_page_task`
-        for each page.
+        for each page, and reports progress after each page via
+        :py:meth:`.process_workspace_report_progress`.
         """
         # aggregate info for logging:
-        nr_succeeded = 0
-        nr_failed = 0
+        progress = ProcessingProgress(nr_pages)
         nr_errors = defaultdict(int) # count causes
         if config.OCRD_MISSING_OUTPUT == 'SKIP':
             reason = "skipped"
         elif config.OCRD_MISSING_OUTPUT == 'COPY':
             reason = "fallback-copied"
-        for task in tasks:
+        for task, page_id, input_files in tasks:
             # wait for results, handle errors
-            page_id, input_files = tasks[task]
             result = self.process_workspace_handle_page_task(page_id, input_files, task)
             if isinstance(result, Exception):
                 nr_errors[result.__class__.__name__] += 1
-                nr_failed += 1
-                # FIXME: this is just prospective, because len(tasks)==nr_failed+nr_succeeded is not guaranteed
-                if config.OCRD_MAX_MISSING_OUTPUTS > 0 and nr_failed / len(tasks) > config.OCRD_MAX_MISSING_OUTPUTS:
+                progress.nr_failed += 1
+                self.process_workspace_report_progress(progress)
+                # FIXME: this is just prospective, because nr_pages==nr_failed+nr_succeeded is not guaranteed
+                if config.OCRD_MAX_MISSING_OUTPUTS > 0 and progress.nr_failed / nr_pages > config.OCRD_MAX_MISSING_OUTPUTS:
                     # already irredeemably many failures, stop short
                     nr_errors = dict(nr_errors)
-                    raise Exception(f"too many failures with {reason} output ({nr_failed} of {nr_failed+nr_succeeded}, {str(nr_errors)})")
-            elif result:
-                nr_succeeded += 1
-            # else skipped - already exists
+                    raise Exception(f"too many failures with {reason} output ({progress.nr_failed} of {progress.nr_failed+progress.nr_succeeded}, {str(nr_errors)})")
+                continue
+            if result:
+                progress.nr_succeeded += 1
+            else:
+                # skipped - already exists
+                progress.nr_skipped += 1
+            self.process_workspace_report_progress(progress)
         nr_errors = dict(nr_errors)
+        nr_succeeded = progress.nr_succeeded
+        nr_failed = progress.nr_failed
         nr_all = nr_succeeded + nr_failed
         if nr_failed > 0:
             if config.OCRD_MAX_MISSING_OUTPUTS > 0 and nr_failed / nr_all > config.OCRD_MAX_MISSING_OUTPUTS:
                 raise Exception(f"too many failures with {reason} output ({nr_failed} of {nr_all}, {str(nr_errors)})")
             self._base_logger.warning("%s %d of %d pages due to %s", reason, nr_failed, nr_all, str(nr_errors))
         self._base_logger.debug("succeeded %d, missed %d of %d pages due to %s", nr_succeeded, nr_failed, nr_all, str(nr_errors))
-        return nr_succeeded, nr_failed, nr_errors, len(tasks)
+        return nr_succeeded, nr_failed, nr_errors, nr_pages
+
+    def process_workspace_report_progress(self, progress : ProcessingProgress) -> None:
+        """
+        Log the current ``progress`` of :py:meth:`.process_workspace_handle_tasks`
+        and pass it to :py:attr:`progress_callback` (if set).
+
+        (Failures of the callback are only logged.)
+        """
+        getLogger('ocrd.process.progress').info("%s: %s", self.ocrd_tool['executable'], progress)
+        if self.progress_callback:
+            try:
+                self.progress_callback(progress)
+            except Exception as err:
+                self._base_logger.warning(f"progress callback failed: {err!r}")
 
     def process_workspace_handle_page_task(self, page_id : str, input_files : List[Optional[OcrdFileType]], task : TFuture) -> Union[bool, Exception]:
         """
@@ -707,7 +1151,10 @@ class Processor():
             # offers nothing to that effect:
             # task.result(timeout=max_seconds or None)
             # so we instead applied the timeout within the worker function
-            task.result()
+            mets_changes = task.result()
+            if mets_changes:
+                # from forked worker without METS Server
+                RecordingOcrdMets.replay(self.workspace.mets, mets_changes)
             return True
         except NotImplementedError:
             # exclude NotImplementedError, so we can try process() below
@@ -807,40 +1254,45 @@ class Processor():
                 f"A file with ID=={output_file_id} already exists {output_file} and neither force nor ignore are set"
             )
         result = self.process_page_pcgts(*input_pcgts, page_id=page_id)
-        for image_result in result.images:
-            image_file_id = f'{output_file_id}_{image_result.file_id_suffix}'
-            image_file_path = join(self.output_file_grp, f'{image_file_id}.png')
-            if isinstance(image_result.alternative_image, PageType):
-                # special case: not an alternative image, but replacing the original image
-                # (this is needed by certain processors when the original's coordinate system
-                #  cannot or must not be kept)
-                image_result.alternative_image.set_imageFilename(image_file_path)
-                image_result.alternative_image.set_imageWidth(image_result.pil.width)
-                image_result.alternative_image.set_imageHeight(image_result.pil.height)
-            elif isinstance(image_result.alternative_image, AlternativeImageType):
-                image_result.alternative_image.set_filename(image_file_path)
-            elif image_result.alternative_image is None:
-                pass # do not reference in PAGE result
-            else:
-                raise ValueError(f"process_page_pcgts returned an OcrdPageResultImage of unknown type "
-                                 f"{type(image_result.alternative_image)}")
-            self.workspace.save_image_file(
-                image_result.pil,
-                image_file_id,
-                self.output_file_grp,
+        # with a METS Server, add all outputs of the page in a single request
+        batch = self.workspace.mets.batch() if isinstance(self.workspace.mets, ClientSideOcrdMets) else nullcontext()
+        with batch:
+            # (deferred, as the PAGE model is expensive to import)
+            from ocrd_models.ocrd_page import PageType, AlternativeImageType
+            for image_result in result.images:
+                image_file_id = f'{output_file_id}_{image_result.file_id_suffix}'
+                image_file_path = join(self.output_file_grp, f'{image_file_id}.png')
+                if isinstance(image_result.alternative_image, PageType):
+                    # special case: not an alternative image, but replacing the original image
+                    # (this is needed by certain processors when the original's coordinate system
+                    #  cannot or must not be kept)
+                    image_result.alternative_image.set_imageFilename(image_file_path)
+                    image_result.alternative_image.set_imageWidth(image_result.pil.width)
+                    image_result.alternative_image.set_imageHeight(image_result.pil.height)
+                elif isinstance(image_result.alternative_image, AlternativeImageType):
+                    image_result.alternative_image.set_filename(image_file_path)
+                elif image_result.alternative_image is None:
+                    pass # do not reference in PAGE result
+                else:
+                    raise ValueError(f"process_page_pcgts returned an OcrdPageResultImage of unknown type "
+                                     f"{type(image_result.alternative_image)}")
+                self.workspace.save_image_file(
+                    image_result.pil,
+                    image_file_id,
+                    self.output_file_grp,
+                    page_id=page_id,
+                    file_path=image_file_path,
+                )
+            result.pcgts.set_pcGtsId(output_file_id)
+            self.add_metadata(result.pcgts)
+            self.workspace.add_file(
+                file_id=output_file_id,
+                file_grp=self.output_file_grp,
                 page_id=page_id,
-                file_path=image_file_path,
+                local_filename=os.path.join(self.output_file_grp, output_file_id + '.xml'),
+                mimetype=MIMETYPE_PAGE,
+                content=to_xml(result.pcgts),
             )
-        result.pcgts.set_pcGtsId(output_file_id)
-        self.add_metadata(result.pcgts)
-        self.workspace.add_file(
-            file_id=output_file_id,
-            file_grp=self.output_file_grp,
-            page_id=page_id,
-            local_filename=os.path.join(self.output_file_grp, output_file_id + '.xml'),
-            mimetype=MIMETYPE_PAGE,
-            content=to_xml(result.pcgts),
-        )
 
     def process_page_pcgts(self, *input_pcgts : Optional[OcrdPage], page_id : Optional[str] = None) -> OcrdPageResult:
         """
@@ -867,6 +1319,7 @@ class Processor():
         Add PAGE-XML :py:class:`~ocrd_models.ocrd_page.MetadataItemType` ``MetadataItem`` describing
         the processing step and runtime parameters to :py:class:`.OcrdPage` ``pcgts``.
         """
+        from ocrd_models.ocrd_page import MetadataItemType, LabelType, LabelsType
         metadata_obj = pcgts.get_Metadata()
         assert metadata_obj is not None
         metadata_obj.add_MetadataItem(
@@ -913,6 +1366,19 @@ class Processor():
             return ret[0]
         raise ResourceNotFoundError(val, executable)
 
+    def share_resource(self, val):
+        """
+        Resolve a resource name to a file path with the algorithm in
+        `spec <https://ocr-d.de/en/spec/ocrd_tool#file-parameters>`_,
+        then map its contents into memory read-only (cf. :py:meth:`.setup_shared`).
+
+        Args:
+            val (string): resource value to map
+        Returns:
+            a read-only `mmap.mmap`, shared by all processes mapping the same file
+        """
+        return share_file(self.resolve_resource(val))
+
     def show_resource(self, val):
         """
         Resolve a resource name to a file path with the algorithm in
@@ -1132,25 +1598,62 @@ in Processor.process_workspace. Forking allows inheriting global
 objects, and with the METS Server we do not mutate the local
 processor instance anyway.
 """
-def _page_worker_set_ctxt(processor, log_queue):
+_page_worker_start_queue = None
+"""
+Where page workers send the pageId and time when they start
+processing a page (for the watchdog in the parent process).
+"""
+def _page_worker_set_ctxt(processor, log_queue, start_queue=None, record_mets=False):
     """
     Overwrites `ocrd.processor.base._page_worker_processor` instance
     for sharing with subprocesses in ProcessPoolExecutor initializer.
     """
-    global _page_worker_processor
+    global _page_worker_processor, _page_worker_start_queue
     _page_worker_processor = processor
+    _page_worker_start_queue = start_queue
+    if record_mets:
+        # subprocess has its own copy of the local METS
+        processor.workspace.mets = RecordingOcrdMets(processor.workspace.mets)
     if log_queue:
         # replace all log handlers with just one queue handler
         logging.root.handlers = [logging.handlers.QueueHandler(log_queue)]
 
-def _page_worker(timeout, *input_files):
+def _page_worker_files(executor, input_files):
+    """
+    Detach local input files from their METS for sending them
+    to page worker subprocesses (as lxml elements cannot be pickled).
+    """
+    if not isinstance(executor, PageWorkerPool):
+        return input_files
+    return [ClientSideOcrdFile(None, ID=input_file.ID, fileGrp=input_file.fileGrp,
+                               pageId=input_file.pageId, mimetype=input_file.mimetype,
+                               url=input_file.url, local_filename=input_file.local_filename)
+            if isinstance(input_file, OcrdFile) else input_file
+            for input_file in input_files]
+
+def _page_worker(timeout, *input_files, overwrite=False):
     """
     Wraps a `Processor.process_page_file` call as payload (call target)
     of the ProcessPoolExecutor workers, but also enforces the given timeout.
+    If `overwrite`, then existing outputs for the page get replaced
+    (regardless of ``OCRD_EXISTING_OUTPUT``).
+
+    Returns the METS changes recorded in the subprocess (if any).
     """
     page_id = next((file.pageId for file in input_files
                     if hasattr(file, 'pageId')), "")
-    if timeout > 0:
+    mets = _page_worker_processor.workspace.mets
+    if isinstance(mets, RecordingOcrdMets):
+        # discard changes of previous failed pages
+        mets.pop_changes()
+    if _page_worker_start_queue:
+        _page_worker_start_queue.put((page_id, time()))
+    # only the main thread can be interrupted
+    interruptible = timeout > 0 and current_thread() is main_thread()
+    if overwrite:
+        existing_output = config.OCRD_EXISTING_OUTPUT
+        config.OCRD_EXISTING_OUTPUT = 'OVERWRITE'
+    if interruptible:
         timer = Timer(timeout, interrupt_main)
         timer.start()
     try:
@@ -1160,8 +1663,13 @@ def _page_worker(timeout, *input_files):
         _page_worker_processor.logger.debug("page worker timed out for page %s", page_id)
         raise TimeoutError()
     finally:
-        if timeout > 0:
+        if interruptible:
             timer.cancel()
+        if overwrite:
+            config.OCRD_EXISTING_OUTPUT = existing_output
+    if isinstance(mets, RecordingOcrdMets):
+        return mets.pop_changes()
+    return None
 
 def generate_processor_help(ocrd_tool, processor_instance=None, subcommand=None):
     """Generate a string describing the full CLI of this processor including params.
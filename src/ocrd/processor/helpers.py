@@ -40,7 +40,8 @@ def run_processor(
         parameter=None,
         working_dir=None,
         mets_server_url=None,
-        instance_caching=False
+        instance_caching=False,
+        progress_callback=None
 ): # pylint: disable=too-many-locals
     """
     Instantiate a Pythonic processor, open a workspace, run the processor and save the workspace.
@@ -69,6 +70,10 @@ def run_processor(
     least frequently. (See :py:class:`~ocrd_network.ProcessingWorker` and
     :py:class:`~ocrd_network.ProcessorServer` for use-cases.)
 
+    If :py:attr:`progress_callback` is not none, then it will be called with the
+    current :py:class:`~ocrd.processor.progress.ProcessingProgress` whenever a page
+    has been handled (see :py:attr:`~ocrd.processor.base.Processor.progress_callback`).
+
     Args:
         processorClass (object): Python class of the module processor.
     """
@@ -93,6 +98,8 @@ def run_processor(
         output_file_grp=output_file_grp,
         instance_caching=instance_caching
     )
+    # (also reset on cached instances)
+    processor.progress_callback = progress_callback
 
     ocrd_tool = processor.ocrd_tool
     name = '%s v%s' % (ocrd_tool['executable'], processor.version)
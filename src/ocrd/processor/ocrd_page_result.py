@@ -1,9 +1,11 @@
+from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Union, Optional
+from typing import TYPE_CHECKING, List, Union, Optional
 from ocrd_models.ocrd_page import OcrdPage
 from PIL.Image import Image
 
-from ocrd_models.ocrd_page_generateds import AlternativeImageType, PageType
+if TYPE_CHECKING:
+    from ocrd_models.ocrd_page_generateds import AlternativeImageType, PageType
 
 @dataclass
 class OcrdPageResultImage():
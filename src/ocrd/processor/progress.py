@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Optional
+
+@dataclass
+class ProcessingProgress():
+    """
+    Live counters for the pages of a single run of
+    :py:meth:`~ocrd.processor.base.Processor.process_workspace`
+    """
+    nr_pages : int
+    nr_succeeded : int = 0
+    nr_failed : int = 0
+    nr_skipped : int = 0
+    start_time : float = field(default_factory=perf_counter)
+
+    @property
+    def nr_done(self) -> int:
+        """number of pages handled so far (succeeded, failed or skipped)"""
+        return self.nr_succeeded + self.nr_failed + self.nr_skipped
+
+    @property
+    def elapsed(self) -> float:
+        """seconds since start"""
+        return perf_counter() - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        """pages handled per second"""
+        elapsed = self.elapsed
+        return self.nr_done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """estimated seconds until all pages are handled (None while unknown)"""
+        throughput = self.throughput
+        if not throughput:
+            return None
+        return (self.nr_pages - self.nr_done) / throughput
+
+    def __str__(self) -> str:
+        eta = self.eta
+        return (f"{self.nr_done} of {self.nr_pages} pages done "
+                f"({self.nr_succeeded} succeeded, {self.nr_failed} failed, {self.nr_skipped} skipped), "
+                f"{self.throughput:.2f} pages/s, ETA {'unknown' if eta is None else f'{eta:.0f}s'}")
@@ -0,0 +1,38 @@
+"""
+Helpers for sharing large read-only data between forked page workers.
+
+Forked workers inherit the parent's memory copy-on-write, but merely
+touching Python objects (reference counts, garbage collector headers)
+dirties their pages, so each worker eventually holds a private copy.
+Data placed in shared memory mappings stays a single physical copy.
+"""
+import mmap
+
+import numpy as np
+
+def share_array(array : np.ndarray) -> np.ndarray:
+    """
+    Copy `array` into an anonymous shared memory mapping,
+    which forked processes inherit without copying, and
+    return it as read-only array of the same shape and dtype.
+    """
+    array = np.asarray(array)
+    if array.dtype.hasobject:
+        raise ValueError("cannot share arrays of Python objects")
+    # anonymous mappings are MAP_SHARED, i.e. not copied on fork
+    buffer = mmap.mmap(-1, max(1, array.nbytes))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=buffer)
+    shared[...] = array
+    shared.flags.writeable = False
+    return shared
+
+def share_file(path : str) -> mmap.mmap:
+    """
+    Map the file at `path` into memory read-only, so all processes
+    (forked or not) reading it share the same pages of the OS cache.
+
+    (Pass this to model loaders accepting bytes or buffers, or wrap
+    it with ``numpy.frombuffer``.)
+    """
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
@@ -1,10 +1,12 @@
 import io
-from os import makedirs, unlink, listdir, path
+from collections import OrderedDict
+from os import makedirs, unlink, listdir, path, stat
 from pathlib import Path
 from shutil import copyfileobj
 from re import sub
 from tempfile import NamedTemporaryFile
 from contextlib import contextmanager
+from threading import Lock
 from typing import Optional, Union, Callable
 
 from cv2 import COLOR_GRAY2BGR, COLOR_RGB2BGR, cvtColor
@@ -15,7 +17,7 @@ import requests
 
 from ocrd_models import OcrdMets, OcrdFile
 from ocrd_models.ocrd_file import ClientSideOcrdFile
-from ocrd_models.ocrd_page import parse, BorderType, to_xml
+from ocrd_models.ocrd_page import to_xml
 from ocrd_modelfactory import exif_from_filename, page_from_file
 from ocrd_utils import (
     atomic_write,
@@ -49,7 +51,7 @@ from ocrd_utils import (
 from .workspace_backup import WorkspaceBackupManager
 from .mets_server import ClientSideOcrdMets
 
-__all__ = ['Workspace']
+__all__ = ['Workspace', 'ImageCache']
 
 @contextmanager
 def download_temporary_file(url):
@@ -59,6 +61,80 @@ def download_temporary_file(url):
         yield f
 
 
+class ImageCache():
+    """
+    Least-recently-used cache of decoded (and mode-normalized) images,
+    keyed by their absolute path name and valid as long as the file's
+    modification time stays the same.
+
+    Args:
+        max_bytes (int) : maximum total size of the cached images' pixel data
+
+    Attributes:
+        hits (int) : number of lookups answered from the cache
+        misses (int) : number of lookups that required decoding
+    """
+
+    def __init__(self, max_bytes : int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def __str__(self):
+        return 'ImageCache[images=%d, bytes=%d/%d, hits=%d, misses=%d]' % (
+            len(self), self.nbytes, self.max_bytes, self.hits, self.misses)
+
+    @staticmethod
+    def image_bytes(image : Image.Image) -> int:
+        """Estimate the memory size of the decoded pixels of ``image``"""
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, filename : str, load : Callable[[str], Image.Image]) -> Image.Image:
+        """
+        Get a copy of the image at ``filename`` from the cache,
+        or ``load`` it from the file and add it to the cache.
+        """
+        key = path.abspath(filename)
+        mtime = stat(key).st_mtime_ns
+        with self._lock:
+            if key in self._images and self._images[key][0] == mtime:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._copy(self._images[key][1])
+            self.misses += 1
+        image = load(filename)
+        nbytes = self.image_bytes(image)
+        with self._lock:
+            if key in self._images:
+                self.nbytes -= self.image_bytes(self._images.pop(key)[1])
+            if nbytes <= self.max_bytes:
+                self._images[key] = (mtime, image)
+                self.nbytes += nbytes
+                while self.nbytes > self.max_bytes:
+                    _, (_, evicted) = self._images.popitem(last=False)
+                    self.nbytes -= self.image_bytes(evicted)
+        # callers may modify the result in-place
+        return self._copy(image)
+
+    @staticmethod
+    def _copy(image : Image.Image) -> Image.Image:
+        copy = image.copy()
+        copy.format = image.format
+        return copy
+
+    def clear(self):
+        """Remove all images from the cache"""
+        with self._lock:
+            self._images.clear()
+            self.nbytes = 0
+
+
 class Workspace():
     """
     A workspace is a temporary directory set up for a processor. It's the
@@ -76,6 +152,11 @@ class Workspace():
             `OcrdMets` of this workspace. If `None`, then the METS will be read from and written to
             the filesystem directly.
         baseurl (string, None) : Base URL to prefix to relative URL.
+
+    Attributes:
+        image_cache (:py:class:`ImageCache`) : cache of decoded images
+            (if enabled via :py:data:`~ocrd_utils.config.OCRD_IMAGE_CACHE_SIZE`),
+            or `None`
     """
 
     def __init__(
@@ -107,6 +188,10 @@ class Workspace():
         else:
             self.automatic_backup = None
         self.baseurl = baseurl
+        if config.OCRD_IMAGE_CACHE_SIZE > 0:
+            self.image_cache = ImageCache(config.OCRD_IMAGE_CACHE_SIZE * 1024 ** 2)
+        else:
+            self.image_cache = None
         #  print(mets.to_xml(xmllint=True).decode('utf-8'))
 
     def __repr__(self):
@@ -257,6 +342,7 @@ class Workspace():
                 raise FileNotFoundError("File %s not found in METS" % file_id)
             if page_recursive and ocrd_file.mimetype == MIMETYPE_PAGE:
                 with pushd_popd(self.directory):
+                    from ocrd_models.ocrd_page import parse
                     ocrd_page = parse(self.download_file(ocrd_file).local_filename, silence=True)
                     for img_url in ocrd_page.get_AllAlternativeImagePaths():
                         img_kwargs = {'local_filename': img_url}
@@ -454,8 +540,8 @@ class Workspace():
             log.debug("Saving mets '%s'", self.mets_target)
             if self.automatic_backup:
                 WorkspaceBackupManager(self).add()
-            with atomic_write(self.mets_target) as f:
-                f.write(self.mets.to_xml(xmllint=True).decode('utf-8'))
+            with atomic_write(self.mets_target, mode='wb') as f:
+                self.mets.write(f, xmllint=True)
 
     def _apply_mets_file(self, filename_or_url: str, fun: Callable):
         if not filename_or_url:
@@ -501,7 +587,33 @@ class Workspace():
 
     def _resolve_image_as_pil(self, image_url, coords=None):
         log = getLogger('ocrd.workspace._resolve_image_as_pil')
-        pil_image = self._apply_mets_file(image_url, Image.open)
+        if self.image_cache is None:
+            pil_image = self._apply_mets_file(image_url, self._load_image)
+        else:
+            pil_image = self._apply_mets_file(
+                image_url, lambda filename: self.image_cache.get(filename, self._load_image))
+
+        if coords is None:
+            return pil_image
+
+        # FIXME: remove or replace this by (image_from_polygon+) crop_image ...
+        log.debug("Converting PIL to OpenCV: %s", image_url)
+        color_conversion = COLOR_GRAY2BGR if pil_image.mode in ('1', 'L') else  COLOR_RGB2BGR
+        pil_as_np_array = np.array(pil_image).astype('uint8') if pil_image.mode == '1' else np.array(pil_image)
+        cv2_image = cvtColor(pil_as_np_array, color_conversion)
+
+        poly = np.array(coords, np.int32)
+        log.debug("Cutting region %s from %s", coords, image_url)
+        region_cut = cv2_image[
+            np.min(poly[:, 1]):np.max(poly[:, 1]),
+            np.min(poly[:, 0]):np.max(poly[:, 0])
+        ]
+        return Image.fromarray(region_cut)
+
+    @staticmethod
+    def _load_image(image_filename):
+        log = getLogger('ocrd.workspace._resolve_image_as_pil')
+        pil_image = Image.open(image_filename)
         pil_image.load() # alloc and give up the FD
 
         # Pillow does not properly support higher color depths
@@ -519,7 +631,7 @@ class Workspace():
             if arr_image.dtype.kind == 'i':
                 # signed integer is *not* trustworthy in this context
                 # (usually a mistake in the array interface)
-                log.debug('Casting image "%s" from signed to unsigned', image_url)
+                log.debug('Casting image "%s" from signed to unsigned', image_filename)
                 arr_image.dtype = np.dtype('u' + arr_image.dtype.name)
             if arr_image.dtype.kind == 'u':
                 # integer needs to be scaled linearly to 8 bit
@@ -528,33 +640,18 @@ class Workspace():
                 # but that would be guessing anyway, so here don't
                 # make assumptions on _scale_, just reduce _precision_
                 log.debug('Reducing image "%s" from depth %d bit to 8 bit',
-                          image_url, arr_image.dtype.itemsize * 8)
+                          image_filename, arr_image.dtype.itemsize * 8)
                 arr_image = arr_image >> 8 * (arr_image.dtype.itemsize-1)
                 arr_image = arr_image.astype(np.uint8)
             elif arr_image.dtype.kind == 'f':
                 # float needs to be scaled from [0,1.0] to [0,255]
                 log.debug('Reducing image "%s" from floating point to 8 bit',
-                          image_url)
+                          image_filename)
                 arr_image *= 255
                 arr_image = arr_image.astype(np.uint8)
             pil_image = Image.fromarray(arr_image)
 
-        if coords is None:
-            return pil_image
-
-        # FIXME: remove or replace this by (image_from_polygon+) crop_image ...
-        log.debug("Converting PIL to OpenCV: %s", image_url)
-        color_conversion = COLOR_GRAY2BGR if pil_image.mode in ('1', 'L') else  COLOR_RGB2BGR
-        pil_as_np_array = np.array(pil_image).astype('uint8') if pil_image.mode == '1' else np.array(pil_image)
-        cv2_image = cvtColor(pil_as_np_array, color_conversion)
-
-        poly = np.array(coords, np.int32)
-        log.debug("Cutting region %s from %s", coords, image_url)
-        region_cut = cv2_image[
-            np.min(poly[:, 1]):np.max(poly[:, 1]),
-            np.min(poly[:, 0]):np.max(poly[:, 0])
-        ]
-        return Image.fromarray(region_cut)
+        return pil_image
 
     def image_from_page(self, page, page_id,
                         fill='background', transparency=False,
@@ -640,15 +737,17 @@ class Workspace():
                     feature_filter='binarized,grayscale_normalized')
         """
         log = getLogger('ocrd.workspace.image_from_page')
+        # only read the header of the original image here
+        # (its pixels are not needed if an AlternativeImage gets selected)
         page_image_info = self.resolve_image_exif(page.imageFilename)
-        page_image = self._resolve_image_as_pil(page.imageFilename)
+        page_image = None
         page_coords = {}
         # use identity as initial affine coordinate transform:
         page_coords['transform'] = np.eye(3)
         # interim bbox (updated with each change to the transform):
-        page_bbox = [0, 0, page_image.width, page_image.height]
+        page_bbox = [0, 0, page_image_info.width, page_image_info.height]
         page_xywh = {'x': 0, 'y': 0,
-                     'w': page_image.width, 'h': page_image.height}
+                     'w': page_image_info.width, 'h': page_image_info.height}
 
         border = page.get_Border()
         # page angle: PAGE @orientation is defined clockwise,
@@ -706,6 +805,8 @@ class Workspace():
                           best_features, page_id)
                 page_image = self._resolve_image_as_pil(best_image.get_filename())
                 page_coords['features'] = best_image.get_comments() # including duplicates
+        if page_image is None:
+            page_image = self._resolve_image_as_pil(page.imageFilename)
 
         # adjust the coord transformation to the steps applied on the image,
         # and apply steps on the existing image in case it is missing there,
@@ -1125,6 +1226,8 @@ class Workspace():
             return self.mets.find_files(*args, **kwargs)
 
 def _crop(log, name, segment, parent_image, parent_coords, op='cropped', **kwargs):
+    # (deferred, as the PAGE model is expensive to import)
+    from ocrd_models.ocrd_page import BorderType
     segment_coords = parent_coords.copy()
     # get polygon outline of segment relative to parent image:
     segment_polygon = coordinates_of_segment(segment, parent_image, parent_coords)
@@ -1179,6 +1282,7 @@ def _reflect(log, name, orientation, segment_image, segment_coords, segment_xywh
     return segment_image, segment_coords, segment_xywh
 
 def _rotate(log, name, skew, segment, segment_image, segment_coords, segment_xywh, **kwargs):
+    from ocrd_models.ocrd_page import BorderType
     # Rotate around center in affine coordinate transform:
     # (consistent with image rotation or AlternativeImage below)
     segment_coords['transform'] = rotate_coordinates(
@@ -3,7 +3,11 @@
 Factory methods to create models for data, files, URLs.
 
 """
+from copy import copy
 from datetime import datetime
+from functools import lru_cache
+from os import stat
+from os.path import abspath
 from pathlib import Path
 from typing import Tuple, Union
 from yaml import safe_load, safe_dump
@@ -13,10 +17,7 @@ from lxml import etree as ET
 
 from ocrd_utils import VERSION, MIMETYPE_PAGE, guess_media_type
 from ocrd_models import OcrdExif, OcrdFile, ClientSideOcrdFile
-from ocrd_models.ocrd_page import (
-    OcrdPage, PcGtsType, PageType, MetadataType,
-    parse, parseEtree
-)
+from ocrd_models.ocrd_page import OcrdPage
 from ocrd_utils.deprecate import deprecation_warning
 
 __all__ = [
@@ -31,11 +32,18 @@ def exif_from_filename(image_filename):
     Create :py:class:`~ocrd_models.ocrd_exif.OcrdExif`
     by opening an image file with PIL and reading its metadata.
 
+    (Results are cached for each path name and modification time.)
+
     Arguments:
         image_filename (str): Local image path name (relative to workspace).
     """
     if image_filename is None:
         raise Exception("Must pass 'image_filename' to 'exif_from_filename'")
+    image_filename = abspath(image_filename)
+    return copy(_exif_from_file(image_filename, stat(image_filename).st_mtime_ns))
+
+@lru_cache(maxsize=1024)
+def _exif_from_file(image_filename, mtime): # pylint: disable=unused-argument
     with Image.open(image_filename) as pil_img:
         ocrd_exif = OcrdExif(pil_img)
     return ocrd_exif
@@ -56,6 +64,8 @@ def page_from_image(input_file : Union[OcrdFile, ClientSideOcrdFile], **kwargs)
         raise ValueError("input_file must have 'local_filename' property")
     if not Path(input_file.local_filename).exists():
         raise FileNotFoundError("File not found: '%s' (%s)" % (input_file.local_filename, input_file))
+    # (deferred, as the PAGE model is expensive to import)
+    from ocrd_models.ocrd_page import PcGtsType, PageType, MetadataType
     exif = exif_from_filename(input_file.local_filename)
     now = datetime.now()
     pcgts = PcGtsType(
@@ -101,6 +111,7 @@ def page_from_file(input_file, **kwargs) -> OcrdPage:
     if input_file.mimetype.startswith('image'):
         return page_from_image(input_file)
     if input_file.mimetype == MIMETYPE_PAGE:
+        from ocrd_models.ocrd_page import parseEtree
         revmap = {}
         # the old/default gds.reverse_node_mapping is useless
         # since 2.39.4, we can actually get the exact reverse mapping for perfect round-trip
@@ -4,7 +4,14 @@ APIs and schemas for various file formats in the OCR domain.
 from .ocrd_agent import OcrdAgent, ClientSideOcrdAgent
 from .ocrd_exif import OcrdExif
 from .ocrd_file import OcrdFile, ClientSideOcrdFile, OcrdFileType
-from .ocrd_mets import OcrdMets
-from .ocrd_page import OcrdPage, OcrdPageType
+from .ocrd_mets import OcrdMets, RecordingOcrdMets, SynchronizedOcrdMets
+from .ocrd_page import OcrdPage
 from .ocrd_xml_base import OcrdXmlDocument
 from .report import ValidationReport
+
+def __getattr__(name):
+    # (needs the generateDS model, which ocrd_page only loads on demand)
+    if name == 'OcrdPageType':
+        from .ocrd_page import OcrdPageType
+        return OcrdPageType
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
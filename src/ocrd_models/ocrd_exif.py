@@ -39,12 +39,66 @@ class OcrdExif():
         self.height = img.height
         self.photometricInterpretation = img.mode
         self.n_frames = img.n_frames if 'n_frames' in img.__dict__ else 1
+        if self.run_header(img):
+            return
         if which('identify'):
             self.run_identify(img)
         else:
             getLogger('ocrd.exif').warning("ImageMagick 'identify' not available, Consider installing ImageMagick for more robust pixel density estimation")
             self.run_pil(img)
 
+    def run_header(self, img):
+        """
+        Read the pixel density from the file header (as already parsed by PIL)
+        for TIFF, PNG, JPEG and JPEG 2000, with the same semantics as ``identify``.
+
+        Returns whether the image format is supported.
+        """
+        if img.format not in ('TIFF', 'PNG', 'JPEG', 'JPEG2000'):
+            return False
+        for prop in ['compression', 'photometric_interpretation']:
+            setattr(self, prop, img.info[prop] if prop in img.info else None)
+        if img.format == 'TIFF':
+            tags = img.tag_v2
+            if 282 in tags and 283 in tags:
+                self._set_resolution(float(tags[282]), float(tags[283]),
+                                     'cm' if tags.get(296) == 3 else 'inches')
+            else:
+                self._set_resolution(1, 1, 'inches')
+        elif img.format == 'PNG':
+            if 'dpi' in img.info:
+                # pHYs in pixels per meter (converted to inches by PIL)
+                self._set_resolution(round(img.info['dpi'][0] / 0.0254) / 100,
+                                     round(img.info['dpi'][1] / 0.0254) / 100, 'cm')
+            elif 'aspect' in img.info:
+                self._set_resolution(*img.info['aspect'], 'inches')
+            else:
+                self._set_resolution(1, 1, 'inches')
+        elif img.format == 'JPEG':
+            exif = img.getexif()
+            if img.info.get('jfif_unit') in (1, 2):
+                self._set_resolution(*img.info['jfif_density'],
+                                     'cm' if img.info['jfif_unit'] == 2 else 'inches')
+            elif 282 in exif and 283 in exif:
+                self._set_resolution(float(exif[282]), float(exif[283]),
+                                     'cm' if exif.get(296) == 3 else 'inches')
+            elif 'jfif_density' in img.info:
+                self._set_resolution(*img.info['jfif_density'], 'inches')
+            else:
+                self._set_resolution(1, 1, 'inches')
+        elif img.format == 'JPEG2000':
+            if 'dpi' in img.info:
+                self._set_resolution(*img.info['dpi'], 'inches')
+            else:
+                self._set_resolution(1, 1, 'inches')
+        return True
+
+    def _set_resolution(self, xResolution, yResolution, resolutionUnit):
+        self.xResolution = max(int(xResolution), 1)
+        self.yResolution = max(int(yResolution), 1)
+        self.resolutionUnit = resolutionUnit
+        self.resolution = round(sqrt(self.xResolution * self.yResolution))
+
     def run_identify(self, img):
         for prop in ['compression', 'photometric_interpretation']:
             setattr(self, prop, img.info[prop] if prop in img.info else None)
@@ -110,7 +110,9 @@ class OcrdFile():
             raise Exception("OcrdFile %s has no member 'mets' pointing to parent OcrdMets" % self)
         old_id = self.ID
         self._el.set('ID', ID)
-        # also update the references in the physical structmap
+        # also update the file caches and the references in the physical structmap
+        if old_id:
+            self.mets._update_file_id(old_id, self._el)
         for pageId in self.mets.remove_physical_page_fptr(fileId=old_id):
             self.pageId = pageId
 
@@ -2,9 +2,12 @@
 API to METS
 """
 from datetime import datetime
+from functools import wraps
+from threading import RLock
+from types import GeneratorType
 import re
 from lxml import etree as ET
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from ocrd_utils import (
     getLogger,
@@ -53,12 +56,22 @@ class OcrdMets(OcrdXmlDocument):
     # The inner dictionary's Key: 'file.ID'
     # The inner dictionary's Value: a 'file' object at some memory location
     _file_cache : Dict[str, Dict[str, ET._Element]]
+    # Cache for the files (mets:file) across all fileGrps
+    # The dictionary's Key: 'file.ID'
+    # The dictionary's Value: list of 'file' objects (normally exactly one)
+    _file_id_cache : Dict[str, List[ET._Element]]
     # Cache for the file pointers (mets:fptr) - two nested dictionaries
     # The outer dictionary's Key: 'div.ID'
     # The outer dictionary's Value: Inner dictionary
     # The inner dictionary's Key: 'fptr.FILEID'
     # The inner dictionary's Value: a 'fptr' object at some memory location
     _fptr_cache : Dict[str, Dict[str, ET._Element]]
+    # Reverse cache for the file pointers (mets:fptr) - two nested dictionaries
+    # The outer dictionary's Key: 'fptr.FILEID'
+    # The outer dictionary's Value: Inner dictionary
+    # The inner dictionary's Key: 'div.ID'
+    # The inner dictionary's Value: a 'div' object at some memory location
+    _fptr_rev_cache : Dict[str, Dict[str, ET._Element]]
 
     @staticmethod
     def empty_mets(now : Optional[str] = None, cache_flag : bool = False):
@@ -121,6 +134,7 @@ class OcrdMets(OcrdXmlDocument):
             for el_file in el_fileGrp:
                 file_id = el_file.get('ID')
                 self._file_cache[fileGrp_use].update({file_id: el_file})
+                self._file_id_cache.setdefault(file_id, []).append(el_file)
                 # log.info("File added to the cache: %s" % file_id)
 
         # Fill with pages
@@ -143,6 +157,7 @@ class OcrdMets(OcrdXmlDocument):
 
             for el_fptr in el_div:
                 self._fptr_cache[div_id].update({el_fptr.get('FILEID'): el_fptr})
+                self._fptr_rev_cache.setdefault(el_fptr.get('FILEID'), {})[div_id] = el_div
                 # log.info("Fptr added to the cache: %s" % el_fptr.get('FILEID'))
 
         # log.info("Len of page_cache: %s" % len(self._page_cache[METS_PAGE_DIV_ATTRIBUTE.ID]))
@@ -150,9 +165,11 @@ class OcrdMets(OcrdXmlDocument):
 
     def _initialize_caches(self) -> None:
         self._file_cache = {}
+        self._file_id_cache = {}
         # NOTE we can only guarantee uniqueness for @ID and @ORDER
         self._page_cache = {k : {} for k in METS_PAGE_DIV_ATTRIBUTE}
         self._fptr_cache = {}
+        self._fptr_rev_cache = {}
 
     def _refresh_caches(self) -> None:
         if self._cache_flag:
@@ -162,6 +179,41 @@ class OcrdMets(OcrdXmlDocument):
             # Then the cache is empty even after this operation
             self._fill_caches()
 
+    def _uncache_file_id(self, fileId : str, el_file : ET._Element) -> None:
+        """
+        Remove the ``mets:file`` :py:attr:`el_file` from the global file ID cache
+        """
+        el_files = self._file_id_cache.get(fileId, [])
+        if el_file in el_files:
+            el_files.remove(el_file)
+        if not el_files:
+            self._file_id_cache.pop(fileId, None)
+
+    def _update_file_id(self, old_id : str, el_file : ET._Element) -> None:
+        """
+        Re-key the file caches after the ``@ID`` of ``mets:file`` :py:attr:`el_file` changed from :py:attr:`old_id`
+        """
+        if not self._cache_flag:
+            return
+        fileGrp = el_file.getparent().get('USE')
+        el_files = self._file_cache.get(fileGrp, {})
+        if el_files.get(old_id) is el_file:
+            # keep the document order
+            self._file_cache[fileGrp] = {el_file.get('ID') if fileId == old_id else fileId: el
+                                         for fileId, el in el_files.items()}
+            self._uncache_file_id(old_id, el_file)
+            self._file_id_cache.setdefault(el_file.get('ID'), []).append(el_file)
+
+    def _uncache_fptr(self, pageId : str, fileId : str) -> None:
+        """
+        Remove the ``mets:fptr`` for :py:attr:`fileId` in page :py:attr:`pageId` from both fptr caches
+        """
+        del self._fptr_cache[pageId][fileId]
+        pages = self._fptr_rev_cache.get(fileId, {})
+        pages.pop(pageId, None)
+        if not pages:
+            self._fptr_rev_cache.pop(fileId, None)
+
     @property
     def unique_identifier(self) -> Optional[str]:
         """
@@ -272,15 +324,16 @@ class OcrdMets(OcrdXmlDocument):
         Yields:
             :py:class:`ocrd_models:ocrd_file:OcrdFile` instantiations
         """
-        pageId_list = []
+        # file IDs of the selected pages (for membership tests)
+        pageId_fileIds : Dict[str, None] = {}
         if pageId:
             # returns divs instead of strings of ids
             physical_pages = self.get_physical_pages(for_pageIds=pageId, return_divs=True)
             for div in physical_pages:
                 if self._cache_flag:
-                    pageId_list += self._fptr_cache[div.get('ID')]
+                    pageId_fileIds.update(dict.fromkeys(self._fptr_cache[div.get('ID')]))
                 else:
-                    pageId_list += [fptr.get('FILEID') for fptr in div.findall('mets:fptr', NS)]
+                    pageId_fileIds.update(dict.fromkeys(fptr.get('FILEID') for fptr in div.findall('mets:fptr', NS)))
 
         if ID and ID.startswith(REGEX_PREFIX):
             ID = re.compile(ID[REGEX_PREFIX_LEN:])
@@ -292,13 +345,27 @@ class OcrdMets(OcrdXmlDocument):
             url = re.compile(url[REGEX_PREFIX_LEN:])
 
         candidates = []
+        # whether candidates still need to be filtered by fileGrp
+        filter_fileGrp = bool(fileGrp)
         if self._cache_flag:
-            if fileGrp:
+            if isinstance(ID, str):
+                candidates = list(self._file_id_cache.get(ID, []))
+            elif fileGrp:
                 if isinstance(fileGrp, str):
-                    candidates += self._file_cache.get(fileGrp, {}).values()
+                    if pageId:
+                        # (in document order, like without cache)
+                        candidates = [el_file for fileId, el_file in self._file_cache.get(fileGrp, {}).items()
+                                      if fileId in pageId_fileIds]
+                    else:
+                        candidates += self._file_cache.get(fileGrp, {}).values()
                 else:
                     candidates = [x for fileGrp_needle, el_file_list in self._file_cache.items() if
                                   fileGrp.match(fileGrp_needle) for x in el_file_list.values()]
+                filter_fileGrp = False
+            elif pageId:
+                # (in document order, like without cache)
+                candidates = [el_file for id_to_file in self._file_cache.values()
+                              for fileId, el_file in id_to_file.items() if fileId in pageId_fileIds]
             else:
                 candidates = [el_file for id_to_file in self._file_cache.values() for el_file in id_to_file.values()]
         else:
@@ -311,10 +378,10 @@ class OcrdMets(OcrdXmlDocument):
                 else:
                     if not ID.fullmatch(cand.get('ID')): continue
 
-            if pageId is not None and cand.get('ID') not in pageId_list:
+            if pageId is not None and cand.get('ID') not in pageId_fileIds:
                 continue
 
-            if not self._cache_flag and fileGrp:
+            if filter_fileGrp:
                 if isinstance(fileGrp, str):
                     if cand.getparent().get('USE') != fileGrp: continue
                 else:
@@ -499,6 +566,7 @@ class OcrdMets(OcrdXmlDocument):
         if self._cache_flag:
             # Add the file to the file cache
             self._file_cache[fileGrp].update({ID: el_mets_file})
+            self._file_id_cache.setdefault(ID, []).append(el_mets_file)
 
         return mets_file
 
@@ -543,9 +611,8 @@ class OcrdMets(OcrdXmlDocument):
         # Delete the physical page ref
         fptrs = []
         if self._cache_flag:
-            for pageId, fptrdict in self._fptr_cache.items():
-                if ID in fptrdict:
-                    fptrs.append(fptrdict[ID])
+            for pageId in self._fptr_rev_cache.get(ID, {}):
+                fptrs.append(self._fptr_cache[pageId][ID])
         else:
             fptrs = self._tree.getroot().findall('.//mets:fptr[@FILEID="%s"]' % ID, namespaces=NS)
 
@@ -556,7 +623,7 @@ class OcrdMets(OcrdXmlDocument):
             page_div.remove(fptr)
             # Remove the fptr from the cache as well
             if self._cache_flag:
-                del self._fptr_cache[page_div.get('ID')][ID]
+                self._uncache_fptr(page_div.get('ID'), ID)
             # delete empty pages
             if not list(page_div):
                 log.debug("Delete empty page %s", page_div)
@@ -571,6 +638,7 @@ class OcrdMets(OcrdXmlDocument):
         if self._cache_flag:
             parent_use = ocrd_file._el.getparent().get('USE')
             del self._file_cache[parent_use][ocrd_file.ID]
+            self._uncache_file_id(ocrd_file.ID, ocrd_file._el)
 
         # Delete the file reference
         # pylint: disable=protected-access
@@ -708,27 +776,31 @@ class OcrdMets(OcrdXmlDocument):
         if for_fileIds == []:
             return []
         assert for_fileIds # at this point we know for_fileIds is set, assert to convince pyright
-        ret = [None] * len(for_fileIds)
+        pages = self.get_physical_pages_for_files(for_fileIds, return_divs=return_divs)
+        return [pages[fileId] for fileId in for_fileIds]
+
+    def get_physical_pages_for_files(self, fileIds : Iterable[str],
+                                     return_divs : bool = False) -> Dict[str, Optional[Union[str, ET._Element]]]:
+        """
+        Map each ``mets:file`` ``@ID`` in :py:attr:`fileIds` to the ``@ID`` of the
+        physical ``mets:structMap`` ``mets:div`` it belongs to (or ``None``).
+        If return_divs is set, maps to div memory objects instead of strings of ids
+        """
+        ret : Dict[str, Optional[Union[str, ET._Element]]] = dict.fromkeys(fileIds)
         if self._cache_flag:
-            for pageId, fptrdict in self._fptr_cache.items():
-                for fptr in fptrdict:
-                    if fptr in for_fileIds:
-                        index = for_fileIds.index(fptr)
-                        if return_divs:
-                            ret[index] = self._page_cache[METS_PAGE_DIV_ATTRIBUTE.ID][pageId]
-                        else:
-                            ret[index] = pageId
+            for fileId in ret:
+                pages = self._fptr_rev_cache.get(fileId)
+                if pages:
+                    pageId, el_div = next(iter(pages.items()))
+                    ret[fileId] = el_div if return_divs else pageId
         else:
             for page in self._tree.getroot().xpath(
                     'mets:structMap[@TYPE="PHYSICAL"]/mets:div[@TYPE="physSequence"]/mets:div[@TYPE="page"]',
                     namespaces=NS):
                 for fptr in page.findall('mets:fptr', NS):
-                    if fptr.get('FILEID') in for_fileIds:
-                        index = for_fileIds.index(fptr.get('FILEID'))
-                        if return_divs:
-                            ret[index] = page
-                        else:
-                            ret[index] = page.get('ID')
+                    fileId = fptr.get('FILEID')
+                    if fileId in ret and ret[fileId] is None:
+                        ret[fileId] = page if return_divs else page.get('ID')
         return ret
 
     def set_physical_page_for_file(self, pageId : str, ocrd_file : OcrdFile, 
@@ -747,10 +819,9 @@ class OcrdMets(OcrdXmlDocument):
         # delete any existing page mapping for this file.ID
         fptrs = []
         if self._cache_flag:
-            for page, fptrdict in self._fptr_cache.items():
-                if ocrd_file.ID in fptrdict:
-                    if fptrdict[ocrd_file.ID] is not None:
-                        fptrs.append(fptrdict[ocrd_file.ID])
+            for page in self._fptr_rev_cache.get(ocrd_file.ID, {}):
+                if self._fptr_cache[page][ocrd_file.ID] is not None:
+                    fptrs.append(self._fptr_cache[page][ocrd_file.ID])
         else:
             fptrs = self._tree.getroot().findall(
                 'mets:structMap[@TYPE="PHYSICAL"]/mets:div[@TYPE="physSequence"]/mets:div[@TYPE="page"]/mets:fptr[@FILEID="%s"]' %
@@ -758,7 +829,7 @@ class OcrdMets(OcrdXmlDocument):
 
         for el_fptr in fptrs:
             if self._cache_flag:
-                del self._fptr_cache[el_fptr.getparent().get('ID')][ocrd_file.ID]
+                self._uncache_fptr(el_fptr.getparent().get('ID'), ocrd_file.ID)
             el_fptr.getparent().remove(el_fptr)
 
         # find/construct as necessary
@@ -799,6 +870,7 @@ class OcrdMets(OcrdXmlDocument):
         if self._cache_flag:
             # Assign the ocrd fileID to the pageId in the cache
             self._fptr_cache[pageId].update({ocrd_file.ID: el_fptr})
+            self._fptr_rev_cache.setdefault(ocrd_file.ID, {})[pageId] = el_pagediv
 
     def update_physical_page_attributes(self, page_id : str, **kwargs) -> None:
         invalid_keys = list(k for k in kwargs if k not in METS_PAGE_DIV_ATTRIBUTE.names())
@@ -822,9 +894,7 @@ class OcrdMets(OcrdXmlDocument):
         corresponding to the ``mets:file`` :py:attr:`ocrd_file`.
         """
         if self._cache_flag:
-            for pageId, fptrdict in self._fptr_cache.items():
-                if ocrd_file.ID in fptrdict:
-                    return pageId
+            return next(iter(self._fptr_rev_cache.get(ocrd_file.ID, {})), None)
         else:
             ret = self._tree.getroot().find(
                 'mets:structMap[@TYPE="PHYSICAL"]/mets:div[@TYPE="physSequence"]/mets:div[@TYPE="page"]/mets:fptr[@FILEID="%s"]' %
@@ -851,6 +921,10 @@ class OcrdMets(OcrdXmlDocument):
                 for attr in METS_PAGE_DIV_ATTRIBUTE:
                     if attr.name in mets_div_attrib:
                         del self._page_cache[attr][mets_div_attrib[attr.name]]
+                for fileId in self._fptr_cache[ID]:
+                    self._fptr_rev_cache[fileId].pop(ID, None)
+                    if not self._fptr_rev_cache[fileId]:
+                        del self._fptr_rev_cache[fileId]
                 del self._fptr_cache[ID]
 
     def remove_physical_page_fptr(self, fileId : str) -> List[str]:
@@ -867,9 +941,8 @@ class OcrdMets(OcrdXmlDocument):
         # If that's the case then we do not need to iterate 2 loops, just one.
         mets_fptrs = []
         if self._cache_flag:
-            for pageId, fptrdict in self._fptr_cache.items():
-                if fileId in fptrdict:
-                    mets_fptrs.append(fptrdict[fileId])
+            for pageId in self._fptr_rev_cache.get(fileId, {}):
+                mets_fptrs.append(self._fptr_cache[pageId][fileId])
         else:
             mets_fptrs = self._tree.getroot().xpath(
                 'mets:structMap[@TYPE="PHYSICAL"]/mets:div[@TYPE="physSequence"]/mets:div[@TYPE="page"]/mets:fptr[@FILEID="%s"]' % fileId,
@@ -879,7 +952,7 @@ class OcrdMets(OcrdXmlDocument):
             mets_div = mets_fptr.getparent()
             ret.append(mets_div.get('ID'))
             if self._cache_flag:
-                del self._fptr_cache[mets_div.get('ID')][mets_fptr.get('FILEID')]
+                self._uncache_fptr(mets_div.get('ID'), mets_fptr.get('FILEID'))
             mets_div.remove(mets_fptr)
         return ret
 
@@ -929,3 +1002,199 @@ class OcrdMets(OcrdXmlDocument):
             # FIXME: merge structMap logical and structLink as well
             if after_add_cb:
                 after_add_cb(f_dest)
+
+
+class SynchronizedOcrdMets:
+    """
+    Thread-safe facade to a local :py:class:`OcrdMets`, serializing all
+    attribute access and method calls via a reentrant lock (so it can be
+    shared by threads of one process, e.g. for page-parallel processing).
+
+    Generators (like from :py:meth:`OcrdMets.find_files`) are exhausted
+    while holding the lock, so callers iterate over a snapshot.
+
+    Files returned by any method refer back to this facade instead of
+    the wrapped :py:class:`OcrdMets`, and serialize setting their
+    attributes via the same lock.
+    """
+
+    def __init__(self, mets : OcrdMets) -> None:
+        object.__setattr__(self, 'mets', mets)
+        object.__setattr__(self, 'lock', RLock())
+
+    def __str__(self) -> str:
+        return 'Synchronized' + str(self.mets)
+
+    def __getattr__(self, name : str) -> Any:
+        with self.lock:
+            attr = getattr(self.mets, name)
+        if not callable(attr):
+            return attr
+        @wraps(attr)
+        def synchronized(*args, **kwargs):
+            with self.lock:
+                result = attr(*args, **kwargs)
+                if isinstance(result, GeneratorType):
+                    result = iter([self._synchronized_file(item) for item in result])
+                elif isinstance(result, list):
+                    result = [self._synchronized_file(item) for item in result]
+                else:
+                    result = self._synchronized_file(result)
+            return result
+        return synchronized
+
+    def __setattr__(self, name : str, value : Any) -> None:
+        with self.lock:
+            setattr(self.mets, name, value)
+
+    def _synchronized_file(self, item : Any) -> Any:
+        if isinstance(item, OcrdFile) and not isinstance(item, SynchronizedOcrdFile):
+            return SynchronizedOcrdFile(item._el, mets=self)
+        return item
+
+
+class SynchronizedOcrdFile(OcrdFile):
+    """
+    :py:class:`OcrdFile` of a :py:class:`SynchronizedOcrdMets`,
+    setting its attributes while holding the lock of the latter.
+    """
+
+    def __setattr__(self, name : str, value : Any) -> None:
+        mets = getattr(self, 'mets', None)
+        if isinstance(mets, SynchronizedOcrdMets):
+            with mets.lock:
+                super().__setattr__(name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+class RecordingOcrdMets:
+    """
+    Facade to a local :py:class:`OcrdMets`, which also records calls
+    to its mutating methods and assignments to its attributes, so they
+    can be replayed on another instance (e.g. the original in the parent
+    process of forked page workers).
+
+    Files returned by any method record assignments to their attributes
+    (like ``pageId`` or ``local_filename``) as well. Files passed to
+    recorded methods are recorded by their ``ID``.
+    """
+
+    recorded_methods = (
+        'add_agent',
+        'add_file',
+        'remove_file',
+        'remove_one_file',
+        'add_file_group',
+        'rename_file_group',
+        'remove_file_group',
+        'set_physical_page_for_file',
+        'update_physical_page_attributes',
+        'remove_physical_page',
+        'remove_physical_page_fptr',
+    )
+
+    delegated_methods = (
+        'merge',
+    )
+    """
+    Mutating methods implemented via recorded methods
+    (which are thus called on the facade itself).
+    """
+
+    def __init__(self, mets : OcrdMets) -> None:
+        object.__setattr__(self, 'mets', mets)
+        object.__setattr__(self, 'changes', [])
+
+    def __str__(self) -> str:
+        return 'Recording' + str(self.mets)
+
+    def __getattr__(self, name : str) -> Any:
+        if name in self.delegated_methods:
+            return getattr(OcrdMets, name).__get__(self)
+        attr = getattr(self.mets, name)
+        if not callable(attr):
+            return attr
+        @wraps(attr)
+        def recorded(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if name in self.recorded_methods:
+                self.changes.append((name,
+                                     tuple(map(_RecordedFileID.of, args)),
+                                     {key: _RecordedFileID.of(val) for key, val in kwargs.items()}))
+            if isinstance(result, GeneratorType):
+                return map(self._recording_file, result)
+            if isinstance(result, list):
+                return list(map(self._recording_file, result))
+            return self._recording_file(result)
+        return recorded
+
+    def __setattr__(self, name : str, value : Any) -> None:
+        setattr(self.mets, name, value)
+        self.changes.append(('__setattr__', (name, value), {}))
+
+    def _recording_file(self, item : Any) -> Any:
+        if isinstance(item, OcrdFile) and not isinstance(item, RecordingOcrdFile):
+            item = RecordingOcrdFile(item._el, mets=self.mets)
+            object.__setattr__(item, 'recorder', self)
+        return item
+
+    def pop_changes(self) -> List[Tuple[str, tuple, dict]]:
+        """
+        Return and forget all changes recorded so far.
+        """
+        changes = self.changes[:]
+        self.changes.clear()
+        return changes
+
+    @staticmethod
+    def replay(mets : OcrdMets, changes : List[Tuple[str, tuple, dict]]) -> None:
+        """
+        Apply the `changes` recorded elsewhere to `mets`.
+        """
+        def resolve(arg):
+            if isinstance(arg, _RecordedFileID):
+                return next(mets.find_files(ID=str(arg)))
+            return arg
+        for name, args, kwargs in changes:
+            args = tuple(map(resolve, args))
+            kwargs = {key: resolve(val) for key, val in kwargs.items()}
+            if name == '__setattr__' and isinstance(args[0], OcrdFile):
+                setattr(*args)
+            else:
+                getattr(mets, name)(*args, **kwargs)
+
+
+class RecordingOcrdFile(OcrdFile):
+    """
+    :py:class:`OcrdFile` of a :py:class:`RecordingOcrdMets`,
+    recording assignments to its attributes with the latter.
+    """
+
+    recorded_attributes = (
+        'ID',
+        'pageId',
+        'mimetype',
+        'url',
+        'local_filename',
+    )
+
+    def __setattr__(self, name : str, value : Any) -> None:
+        recorder = getattr(self, 'recorder', None)
+        if recorder is not None and name in self.recorded_attributes:
+            # by the ID before the change
+            recorder.changes.append(('__setattr__', (_RecordedFileID(self.ID), name, value), {}))
+        super().__setattr__(name, value)
+
+
+class _RecordedFileID(str):
+    """
+    Reference to a file by its ``ID`` in recorded changes
+    (as :py:class:`OcrdFile` cannot be pickled).
+    """
+
+    @classmethod
+    def of(cls, arg : Any) -> Any:
+        if isinstance(arg, OcrdFile):
+            return cls(arg.ID)
+        return arg
@@ -1,10 +1,74 @@
 """
 API to PAGE-XML, generated with generateDS from XML schema.
 """
+from __future__ import annotations
+from functools import lru_cache
 from io import StringIO
-from typing import Dict, Union, Any
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Union, Any
 from lxml import etree as ET
-from elementpath import XPath2Parser, XPathContext
+
+if TYPE_CHECKING:
+    from elementpath import XPath2Parser, XPathContext
+    from .ocrd_page_generateds import (
+        parse,
+        parseEtree,
+        parseString,
+        AdvertRegionType,
+        AlternativeImageType,
+        BaselineType,
+        BorderType,
+        ChartRegionType,
+        ChemRegionType,
+        CoordsType,
+        CustomRegionType,
+        GlyphType,
+        GraphemeBaseType,
+        GraphemeGroupType,
+        GraphemeType,
+        GraphemesType,
+        GraphicRegionType,
+        GridPointsType,
+        GridType,
+        ImageRegionType,
+        LabelType,
+        LabelsType,
+        LayerType,
+        LayersType,
+        LineDrawingRegionType,
+        MapRegionType,
+        MathsRegionType,
+        MetadataItemType,
+        MetadataType,
+        MusicRegionType,
+        NoiseRegionType,
+        NonPrintingCharType,
+        OrderedGroupIndexedType,
+        OrderedGroupType,
+        PageType,
+        PcGtsType,
+        PrintSpaceType,
+        ReadingOrderType,
+        RegionRefIndexedType,
+        RegionRefType,
+        RegionType,
+        RelationType,
+        RelationsType,
+        RolesType,
+        SeparatorRegionType,
+        TableCellRoleType,
+        TableRegionType,
+        TextEquivType,
+        TextLineType,
+        TextRegionType,
+        TextStyleType,
+        UnknownRegionType,
+        UnorderedGroupIndexedType,
+        UnorderedGroupType,
+        UserAttributeType,
+        UserDefinedType,
+        WordType,
+    )
 
 __all__ = [
     'parse',
@@ -71,113 +135,111 @@ __all__ = [
     'to_xml'
 ]
 
-from .ocrd_page_generateds import (
-    parse,
-    parseEtree,
-    parseString,
-
-    AdvertRegionType,
-    AlternativeImageType,
-    BaselineType,
-    BorderType,
-    ChartRegionType,
-    ChemRegionType,
-    CoordsType,
-    CustomRegionType,
-    GlyphType,
-    GraphemeBaseType,
-    GraphemeGroupType,
-    GraphemeType,
-    GraphemesType,
-    GraphicRegionType,
-    GridPointsType,
-    GridType,
-    ImageRegionType,
-    LabelType,
-    LabelsType,
-    LayerType,
-    LayersType,
-    LineDrawingRegionType,
-    MapRegionType,
-    MathsRegionType,
-    MetadataItemType,
-    MetadataType,
-    MusicRegionType,
-    NoiseRegionType,
-    NonPrintingCharType,
-    OrderedGroupIndexedType,
-    OrderedGroupType,
-    PageType,
-    PcGtsType,
-    PrintSpaceType,
-    ReadingOrderType,
-    RegionRefIndexedType,
-    RegionRefType,
-    RegionType,
-    RelationType,
-    RelationsType,
-    RolesType,
-    SeparatorRegionType,
-    TableCellRoleType,
-    TableRegionType,
-    TextEquivType,
-    TextLineType,
-    TextRegionType,
-    TextStyleType,
-    UnknownRegionType,
-    UnorderedGroupIndexedType,
-    UnorderedGroupType,
-    UserAttributeType,
-    UserDefinedType,
-    WordType
-)
-
 from .constants import NAMESPACES
 from .xpath_functions import pc_functions
 
-# add docstrings
-parse.__doc__ = (
-    """Parse a file, create the object tree, and export it.
-
-    Arguments:
-        inFileName (str) -- Path to the PAGE-XML file.
-        print_warnings (boolean) -- If true, write parser \
-                                    warnings to stderr.
+# the generateDS model is large, so it only gets imported on first use
+_GENERATEDS_NAMES = [name for name in __all__ if name not in ('OcrdPage', 'OcrdPageType', 'to_xml')]
 
-    Returns:
-        The root object in the tree.
+def _load_generateds():
     """
-)
-
-parseEtree.__doc__ = (
-    """Parse a file, create the object tree, and export it. Return tree and mappings, too.
-
-    Arguments:
-        inFileName (str) -- Path to the PAGE-XML file.
-        print_warnings (boolean) -- If true, write parser \
-                                    warnings to stderr.
-
-    Returns:
-        A tuple of
-         * The root object in the tree.
-         * The full node tree.
-         * A mapping from object IDs to tree nodes.
-         * A reverse mapping from tree nodes to object IDs.
+    Import the generateDS model and make its API available in this module.
     """
-)
+    from . import ocrd_page_generateds as generateds
+    # add docstrings
+    generateds.parse.__doc__ = (
+        """Parse a file, create the object tree, and export it.
+
+        Arguments:
+            inFileName (str) -- Path to the PAGE-XML file.
+            print_warnings (boolean) -- If true, write parser \
+                                        warnings to stderr.
+
+        Returns:
+            The root object in the tree.
+        """
+    )
+
+    generateds.parseEtree.__doc__ = (
+        """Parse a file, create the object tree, and export it. Return tree and mappings, too.
+
+        Arguments:
+            inFileName (str) -- Path to the PAGE-XML file.
+            print_warnings (boolean) -- If true, write parser \
+                                        warnings to stderr.
+
+        Returns:
+            A tuple of
+             * The root object in the tree.
+             * The full node tree.
+             * A mapping from object IDs to tree nodes.
+             * A reverse mapping from tree nodes to object IDs.
+        """
+    )
+
+    # fix generated (malformed) docstrings
+    generateds.parseString.__doc__ = (
+        """Parse a string, create the object tree, and export it.
+
+        Arguments:
+            inString (str) -- This XML fragment should not start \
+                              with an XML declaration containing an encoding.
 
-# fix generated (malformed) docstrings
-parseString.__doc__ = (
-    """Parse a string, create the object tree, and export it.
+        Returns:
+            The root object in the tree.
+        """
+    )
+    globals().update({name: getattr(generateds, name) for name in _GENERATEDS_NAMES})
+    globals()['OcrdPageType'] = Union[OcrdPage, generateds.PcGtsType]
 
-    Arguments:
-        inString (str) -- This XML fragment should not start \
-                          with an XML declaration containing an encoding.
+_generateds_lock = Lock()
 
-    Returns:
-        The root object in the tree.
+def __getattr__(name):
+    if name in _GENERATEDS_NAMES or name == 'OcrdPageType':
+        with _generateds_lock:
+            # (unless another thread has loaded it meanwhile)
+            if name not in globals():
+                _load_generateds()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_xpath_parser = None
+_xpath_parser_lock = Lock()
+
+def _get_xpath_parser() -> XPath2Parser:
+    """
+    Get the XPath 2.0 parser shared by all :py:class:`OcrdPage` instances
+    (with the ``pc:`` functions registered), creating it on first use.
     """
-)
+    global _xpath_parser
+    with _xpath_parser_lock:
+        if _xpath_parser is None:
+            # (deferred, as importing elementpath is expensive)
+            from elementpath import XPath2Parser
+            parser = XPath2Parser(namespaces={
+                'page': NAMESPACES['page'],
+                'pc': NAMESPACES['page']})
+            for func in pc_functions:
+                name = func.__name__.replace('_', '-')
+                if name.startswith('pc-'):
+                    name = name[3:]
+                elif name.startswith('pc'):
+                    name = name[2:]
+                # register
+                parser.external_function(func, name=name, prefix='pc')
+            _xpath_parser = parser
+        return _xpath_parser
+
+@lru_cache(maxsize=256)
+def _compile_xpath(expression : str):
+    """
+    Parse ``expression`` into a (context-independent) XPath 2.0 token tree,
+    which can be evaluated repeatedly.
+    """
+    parser = _get_xpath_parser()
+    # the parser itself is stateful
+    with _xpath_parser_lock:
+        return parser.parse(expression)
 
 class OcrdPage():
     """
@@ -197,24 +259,32 @@ class OcrdPage():
         self.etree = etree
         self.mapping = mapping
         self.revmap = revmap
-        self.xpath_parser = XPath2Parser(namespaces={
-            'page': NAMESPACES['page'],
-            'pc': NAMESPACES['page']})
-        for func in pc_functions:
-            name = func.__name__.replace('_', '-')
-            if name.startswith('pc-'):
-                name = name[3:]
-            elif name.startswith('pc'):
-                name = name[2:]
-            # register
-            self.xpath_parser.external_function(func, name=name, prefix='pc')
-        self.xpath_context = XPathContext(self.etree)
-        self.xpath = lambda expression: self.xpath_parser.parse(expression).get_results(self.xpath_context)
+        self._xpath_context = None
+
+    @property
+    def xpath_parser(self) -> XPath2Parser:
+        return _get_xpath_parser()
+
+    @property
+    def xpath_context(self) -> XPathContext:
+        # only pay for building the node tree when actually queried
+        if self._xpath_context is None:
+            from elementpath import XPathContext
+            self._xpath_context = XPathContext(self.etree)
+        return self._xpath_context
+
+    def xpath(self, expression : str):
+        """
+        Evaluate XPath 2.0 ``expression`` (with ``pc:`` functions) on the etree
+        and return the results.
+        """
+        return _compile_xpath(expression).get_results(self.xpath_context)
 
     def __getattr__(self, name):
         return getattr(self._pcgts, name)
 
-OcrdPageType = Union[OcrdPage, PcGtsType]
+if TYPE_CHECKING:
+    OcrdPageType = Union[OcrdPage, PcGtsType]
 
 def to_xml(el, skip_declaration=False) -> str:
     """
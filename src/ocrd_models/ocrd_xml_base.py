@@ -1,11 +1,12 @@
 """
 Base class for XML documents loaded from either content or filename.
 """
+from copy import deepcopy
 from os.path import exists
 from lxml import etree as ET
 
 from .constants import NAMESPACES
-from .utils import xmllint_format
+from .utils import remove_blank_text, XMLLINT_DECLARATION
 
 
 for curie, url in NAMESPACES.items():
@@ -46,7 +47,29 @@ class OcrdXmlDocument():
             xmllint (boolean): Format with ``xmllint`` in addition to pretty-printing
         """
         root = self._tree.getroot()
-        ret = ET.tostring(ET.ElementTree(root), pretty_print=True, encoding='UTF-8')
         if xmllint:
-            ret = xmllint_format(ret)
-        return ret
+            # same result as xmllint_format, but without serializing and parsing twice
+            # (on a copy, leaving the whitespace in the document itself untouched)
+            root = deepcopy(root)
+            remove_blank_text(root)
+            return XMLLINT_DECLARATION + ET.tostring(root, pretty_print=True, encoding='UTF-8')
+        return ET.tostring(ET.ElementTree(root), pretty_print=True, encoding='UTF-8')
+
+    def write(self, f, xmllint=False):
+        """
+        Serialize all properties as pretty-printed XML like :py:meth:`to_xml`,
+        but incrementally into a binary file object
+
+        Args:
+            f (file): Binary file object to write to
+            xmllint (boolean): Format with ``xmllint`` in addition to pretty-printing
+        """
+        root = self._tree.getroot()
+        if xmllint:
+            root = deepcopy(root)
+            remove_blank_text(root)
+            f.write(XMLLINT_DECLARATION)
+            with ET.xmlfile(f, encoding='UTF-8') as xf:
+                xf.write(root, pretty_print=True)
+        else:
+            ET.ElementTree(root).write(f, pretty_print=True, encoding='UTF-8')
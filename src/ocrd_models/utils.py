@@ -8,11 +8,19 @@ from .constants import NAMESPACES as NS
 
 __all__ = [
     'xmllint_format',
+    'remove_blank_text',
+    'XMLLINT_DECLARATION',
     'handle_oai_response',
     'is_oai_content',
     'extract_mets_from_oai_content'
 ]
 
+XMLLINT_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# whitespace-only text nodes, unless whitespace is preserved explicitly
+BLANK_TEXT_XPATH = ET.XPath(
+    './/text()[normalize-space()=""][not(ancestor::*[@xml:space][1]/@xml:space="preserve")]')
+
 def xmllint_format(xml):
     """
     Pretty-print XML like ``xmllint`` does.
@@ -22,8 +30,42 @@ def xmllint_format(xml):
     """
     parser = ET.XMLParser(resolve_entities=False, strip_cdata=False, remove_blank_text=True)
     document = ET.fromstring(xml, parser)
-    return ('%s\n%s' % ('<?xml version="1.0" encoding="UTF-8"?>',
-                        ET.tostring(document, pretty_print=True, encoding='UTF-8').decode('utf-8'))).encode('utf-8')
+    return XMLLINT_DECLARATION + ET.tostring(document, pretty_print=True, encoding='UTF-8')
+
+def remove_blank_text(root):
+    """
+    Remove ignorable whitespace from the tree below ``root`` in-place, so it can be
+    pretty-printed directly, with the same result as :py:func:`xmllint_format`
+    (which parses with ``remove_blank_text``).
+
+    Like the parser, keep whitespace which is the only content of an element,
+    and whitespace in mixed content (i.e. after some text within the parent element).
+    """
+    # per parent element: last child checked for preceding text, and whether there was any
+    mixed = {}
+    for text in BLANK_TEXT_XPATH(root):
+        if '\r' in text:
+            # serialized as character reference, which is never ignorable
+            continue
+        parent = text.getparent()
+        if text.is_text:
+            if len(parent):
+                parent.text = None
+            continue
+        container = parent.getparent()
+        if container is None:
+            continue
+        last, has_text = mixed.get(container, (None, bool(container.text)))
+        if not has_text:
+            for sibling in parent.itersiblings(preceding=True):
+                if sibling is last:
+                    break
+                if sibling.tail:
+                    has_text = True
+                    break
+        mixed[container] = (parent, has_text)
+        if not has_text:
+            parent.tail = None
 
 def handle_oai_response(response):
     """
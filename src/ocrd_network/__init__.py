@@ -1,7 +1,24 @@
-from .client import Client
-from .constants import AgentType, JobState
-from .processing_server import ProcessingServer
-from .processing_worker import ProcessingWorker
-from .processor_server import ProcessorServer
-from .param_validators import DatabaseParamType, ServerAddressParamType, QueueServerParamType
-from .server_cache import CacheLockedPages, CacheProcessingRequests
+from importlib import import_module
+
+# exported name -> submodule, imported only when needed (as the servers,
+# database and queue dependencies are expensive to import for mere CLI use)
+_exports = {
+    'Client': 'client',
+    'AgentType': 'constants',
+    'JobState': 'constants',
+    'ProcessingServer': 'processing_server',
+    'ProcessingWorker': 'processing_worker',
+    'ProcessorServer': 'processor_server',
+    'DatabaseParamType': 'param_validators',
+    'ServerAddressParamType': 'param_validators',
+    'QueueServerParamType': 'param_validators',
+    'CacheLockedPages': 'server_cache',
+    'CacheProcessingRequests': 'server_cache',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    if name in _exports:
+        return getattr(import_module(f'.{_exports[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
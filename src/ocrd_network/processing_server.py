@@ -2,9 +2,11 @@ from datetime import datetime
 from os import getpid
 from pathlib import Path
 from typing import Dict, List, Optional, Union
+from httpx import ConnectError
 from uvicorn import run as uvicorn_run
 
-from fastapi import APIRouter, FastAPI, File, HTTPException, Request, status, UploadFile
+from fastapi import APIRouter, FastAPI, File, HTTPException, Request, Response, status, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 
@@ -63,7 +65,8 @@ from .utils import (
     expand_page_ids,
     generate_id,
     generate_workflow_content,
-    generate_workflow_content_hash
+    generate_workflow_content_hash,
+    get_uds_path
 )
 
 
@@ -177,6 +180,7 @@ class ProcessingServer(FastAPI):
         - ensure queue is empty or processor is not currently running
         - connect to hosts and kill pids
         """
+        await self.mets_server_proxy.close_async_clients()
         await self.stop_deployed_agents()
 
     def add_api_routes_others(self):
@@ -326,18 +330,34 @@ class ProcessingServer(FastAPI):
         )
         self.include_router(workflow_router)
 
-    async def forward_tcp_request_to_uds_mets_server(self, request: Request) -> Dict:
+    async def forward_tcp_request_to_uds_mets_server(self, request: Request) -> Union[Dict, Response]:
         """Forward mets-server-request
 
         A processor calls a mets related method like add_file with ClientSideOcrdMets. This sends
         a request to this endpoint. This request contains all information necessary to make a call
         to the uds-mets-server. This information is used by `MetsServerProxy` to make a the call
         to the local (local for the processing-server) reachable the uds-mets-server.
+
+        Structured responses are passed through as encoded by the uds-mets-server (negotiated
+        via the client's `Accept` header, i.e. JSON or msgpack).
+
+        Requests are forwarded asynchronously, so concurrent requests do not block each other.
+        The uds-mets-server is only probed and (re)started if it is not registered as running
+        with the deployer, or when it has become unreachable.
         """
         request_body = await request.json()
         ws_dir_path = request_body["workspace_path"]
-        self.deployer.start_uds_mets_server(ws_dir_path=ws_dir_path)
-        return self.mets_server_proxy.forward_tcp_request(request_body=request_body)
+        accept = request.headers.get("accept")
+        mets_server_url = str(get_uds_path(ws_dir_path=ws_dir_path))
+        if not self.deployer.is_mets_server_registered(mets_server_url):
+            await run_in_threadpool(self.deployer.start_uds_mets_server, ws_dir_path=ws_dir_path)
+        try:
+            return await self.mets_server_proxy.forward_tcp_request_async(request_body=request_body, accept=accept)
+        except ConnectError:
+            self.log.warning(f"The UDS mets server for {ws_dir_path} is unreachable, restarting it.")
+            self.deployer.unregister_mets_server(mets_server_url)
+            await run_in_threadpool(self.deployer.start_uds_mets_server, ws_dir_path=ws_dir_path)
+            return await self.mets_server_proxy.forward_tcp_request_async(request_body=request_body, accept=accept)
 
     async def home_page(self):
         message = f"The home page of the {self.title}"
@@ -9,7 +9,8 @@ Each Processing Worker is an instance of an OCR-D processor.
 from __future__ import annotations
 from pathlib import Path
 import psutil
-from time import sleep
+from threading import Lock, Thread
+from time import sleep, time
 from typing import Dict, List, Union
 
 from ocrd import OcrdMetsServer
@@ -32,6 +33,12 @@ class Deployer:
         self.mets_servers: Dict = {}  # {"mets_server_url": "mets_server_pid"}
         # This is required to store UDS urls that are multiplexed through the TCP proxy and are not preserved anywhere
         self.mets_servers_paths: Dict = {}  # {"ws_dir_path": "mets_server_url"}
+        # Registry of mets servers known to be running, to avoid probing them on every request
+        self.mets_servers_checked: Dict = {}  # {"mets_server_url": "time_of_last_check"}
+        # Threads waiting for (and reaping) the mets servers started here
+        self.mets_servers_watchers: Dict = {}  # {"mets_server_url": "watcher_thread"}
+        # Serialize starting the mets server of the same workspace from concurrent requests
+        self.mets_servers_locks: Dict = {}  # {"mets_server_url": "startup_lock"}
         self.use_tcp_mets = ps_config.get("use_tcp_mets", False)
 
     # TODO: Reconsider this.
@@ -142,11 +149,57 @@ class Deployer:
         self.stop_mongodb()
         self.stop_rabbitmq()
 
+    def is_mets_server_registered(self, mets_server_url: str) -> bool:
+        """Whether the mets server is known to be running without probing it: it must have been
+        checked within the last `OCRD_NETWORK_METS_SERVER_LIVENESS_TTL` seconds, or (if started here)
+        its process must still be alive - and its socket file must exist in any case.
+        """
+        # entries may be removed concurrently when the process exits
+        last_checked = self.mets_servers_checked.get(mets_server_url, None)
+        if last_checked is None:
+            return False
+        if not Path(mets_server_url).is_socket():
+            self.mets_servers_checked.pop(mets_server_url, None)
+            return False
+        if time() - last_checked < config.OCRD_NETWORK_METS_SERVER_LIVENESS_TTL:
+            return True
+        pid = self.mets_servers.get(mets_server_url, None)
+        if pid and psutil.pid_exists(pid):
+            self.mets_servers_checked[mets_server_url] = time()
+            return True
+        self.mets_servers_checked.pop(mets_server_url, None)
+        return False
+
+    def unregister_mets_server(self, mets_server_url: str) -> None:
+        """Forget that the mets server is known to be running, so it gets probed again"""
+        self.mets_servers_checked.pop(mets_server_url, None)
+
+    def _watch_uds_mets_server(self, mets_server_url: str, pid: int) -> None:
+        # also reaps the process
+        try:
+            psutil.Process(pid).wait()
+        except psutil.NoSuchProcess:
+            pass
+        self.log.info(f"UDS mets server {mets_server_url} with pid {pid} has exited")
+        if self.mets_servers.get(mets_server_url, None) == pid:
+            self.mets_servers_checked.pop(mets_server_url, None)
+
     def start_uds_mets_server(self, ws_dir_path: str) -> Path:
-        log_file = get_mets_server_logging_file_path(mets_path=ws_dir_path)
         mets_server_url = get_uds_path(ws_dir_path=ws_dir_path)
+        if self.is_mets_server_registered(str(mets_server_url)):
+            return mets_server_url
+        # (setdefault is atomic, so all threads get the same lock)
+        with self.mets_servers_locks.setdefault(str(mets_server_url), Lock()):
+            # another thread may have started it meanwhile
+            if self.is_mets_server_registered(str(mets_server_url)):
+                return mets_server_url
+            return self._start_uds_mets_server(ws_dir_path, mets_server_url)
+
+    def _start_uds_mets_server(self, ws_dir_path: str, mets_server_url: Path) -> Path:
+        log_file = get_mets_server_logging_file_path(mets_path=ws_dir_path)
         if is_mets_server_running(mets_server_url=str(mets_server_url)):
             self.log.debug(f"The UDS mets server for {ws_dir_path} is already started: {mets_server_url}")
+            self.mets_servers_checked[str(mets_server_url)] = time()
             return mets_server_url
         elif Path(mets_server_url).is_socket():
             self.log.warning(
@@ -157,6 +210,10 @@ class Deployer:
         pid = OcrdMetsServer.create_process(mets_server_url=str(mets_server_url), ws_dir_path=str(ws_dir_path), log_file=str(log_file))
         self.mets_servers[str(mets_server_url)] = pid
         self.mets_servers_paths[str(ws_dir_path)] = str(mets_server_url)
+        self.mets_servers_checked[str(mets_server_url)] = time()
+        watcher = Thread(target=self._watch_uds_mets_server, args=(str(mets_server_url), pid), daemon=True)
+        watcher.start()
+        self.mets_servers_watchers[str(mets_server_url)] = watcher
         return mets_server_url
 
     def stop_uds_mets_server(self, mets_server_url: str, path_to_mets: str) -> None:
@@ -167,11 +224,13 @@ class Deployer:
         workspace_path = str(Path(path_to_mets).parent)
         mets_server_url_uds = self.mets_servers_paths[workspace_path]
         mets_server_pid = self.mets_servers[mets_server_url_uds]
+        self.unregister_mets_server(mets_server_url_uds)
         self.log.info(f"Terminating mets server with pid: {mets_server_pid}")
-        p = psutil.Process(mets_server_pid)
-        stop_mets_server(self.log, mets_server_url=mets_server_url, ws_dir_path=workspace_path)
-        if p.is_running():
-            p.wait()
+        watcher = self.mets_servers_watchers.pop(mets_server_url_uds)
+        if watcher.is_alive():
+            stop_mets_server(self.log, mets_server_url=mets_server_url, ws_dir_path=workspace_path)
+            # the watcher reaps the process
+            watcher.join()
             self.log.info(f"Terminated mets server with pid: {mets_server_pid}")
         else:
             self.log.info(f"Mets server with pid: {mets_server_pid} has already terminated.")
@@ -1,6 +1,9 @@
+from fastapi import Response
+from httpx import AsyncClient, AsyncHTTPTransport, ConnectError, Response as HttpxResponse
+from requests import Response as RequestsResponse
 from requests_unixsocket import Session as requests_unixsocket_session
 from .utils import get_uds_path, convert_url_to_uds_format
-from typing import Dict
+from typing import Any, Dict, Optional, Tuple, Union
 from ocrd_utils import getLogger
 
 SUPPORTED_METHOD_TYPES = ["GET", "POST", "PUT", "DELETE"]
@@ -9,6 +12,8 @@ SUPPORTED_METHOD_TYPES = ["GET", "POST", "PUT", "DELETE"]
 class MetsServerProxy:
     def __init__(self) -> None:
         self.session: requests_unixsocket_session = requests_unixsocket_session()
+        # pooled async clients, one per uds-mets-server socket
+        self.async_clients: Dict[str, AsyncClient] = {}
         self.log = getLogger("ocrd_network.tcp_to_uds_mets_proxy")
 
     def forward_tcp_request(self, request_body) -> Dict:
@@ -23,6 +28,59 @@ class MetsServerProxy:
         the endpoint's parameter is a single class, `parameter` is used for "common" parameters and
         `form` for form-parameters
         """
+        response_type, response = self._request(request_body)
+        if response and (response_type == "class" or response_type == "dict"):
+            return response.json()
+        return self._wrap_response(response_type, response)
+
+    async def forward_tcp_request_async(
+        self, request_body, accept: Optional[str] = None
+    ) -> Union[Dict, Response]:
+        """Forward request to uds mets server like :py:meth:`forward_tcp_request`, but without
+        blocking the event loop, via a pooled async client for the workspace's socket.
+
+        `class` and `dict` responses are passed through as received (without decoding and
+        re-encoding). `accept` is forwarded as the `Accept` header, so the uds-mets-server can
+        negotiate the encoding (JSON or msgpack) directly with the original client.
+
+        Raises `httpx.ConnectError` if the uds-mets-server cannot be reached (which is safe to retry,
+        as the request has not been sent yet).
+        """
+        response_type, socket_file, method_type, request_url, kwargs = self._request_args(request_body, accept)
+        client = self.async_clients.get(socket_file)
+        if client is None:
+            client = AsyncClient(transport=AsyncHTTPTransport(uds=socket_file), base_url="http://mets-server")
+            self.async_clients[socket_file] = client
+        try:
+            response = await client.request(method_type, f"/{request_url}", **kwargs)
+        except ConnectError:
+            # do not keep stale connections to a server that went away
+            # (unless a concurrent request has already replaced the client)
+            if self.async_clients.get(socket_file) is client:
+                del self.async_clients[socket_file]
+            await client.aclose()
+            raise
+        if response.status_code < 400 and (response_type == "class" or response_type == "dict"):
+            return Response(
+                content=response.content,
+                status_code=response.status_code,
+                media_type=response.headers.get("content-type", "application/json")
+            )
+        return self._wrap_response(response_type, response)
+
+    async def close_async_clients(self) -> None:
+        """Close all pooled async clients"""
+        while self.async_clients:
+            _, client = self.async_clients.popitem()
+            await client.aclose()
+
+    def _request(self, request_body) -> Tuple[str, RequestsResponse]:
+        response_type, socket_file, method_type, request_url, kwargs = self._request_args(request_body)
+        uds_request_url = f"{convert_url_to_uds_format(socket_file)}/{request_url}"
+        response = self.session.request(method_type, uds_request_url, **kwargs)
+        return response_type, response
+
+    def _request_args(self, request_body, accept: Optional[str] = None) -> Tuple[str, str, str, str, Dict[str, Any]]:
         ws_dir_path: str = request_body["workspace_path"]
         request_url: str = request_body["request_url"]
         response_type: str = request_body["response_type"]
@@ -30,33 +88,32 @@ class MetsServerProxy:
         request_data = request_body["request_data"]
         if method_type not in SUPPORTED_METHOD_TYPES:
             raise NotImplementedError(f"Method type: {method_type} not recognized")
+        if response_type not in ["empty", "text", "class", "dict"]:
+            raise ValueError(f"Unexpected response_type: {response_type}")
         ws_socket_file = str(get_uds_path(ws_dir_path=ws_dir_path))
-        ws_unix_socket_url = convert_url_to_uds_format(ws_socket_file)
-        uds_request_url = f"{ws_unix_socket_url}/{request_url}"
+        kwargs = {"headers": {"Accept": accept} if accept else None}
 
-        self.log.info(f"Forwarding TCP mets server request to UDS url: {uds_request_url}")
+        self.log.info(f"Forwarding TCP mets server request to UDS socket: {ws_socket_file}, url: {request_url}")
         self.log.info(f"Forwarding method type {method_type}, request data: {request_data}, "
                       f"expected response type: {response_type}")
 
         if not request_data:
-            response = self.session.request(method_type, uds_request_url)
+            pass
         elif "params" in request_data:
-            response = self.session.request(method_type, uds_request_url, params=request_data["params"])
+            kwargs["params"] = request_data["params"]
         elif "form" in request_data:
-            response = self.session.request(method_type, uds_request_url, data=request_data["form"])
+            kwargs["data"] = request_data["form"]
         elif "class" in request_data:
-            response = self.session.request(method_type, uds_request_url, json=request_data["class"])
+            kwargs["json"] = request_data["class"]
         else:
             raise ValueError("Expecting request_data to be empty or containing single key: params,"
                              f"form, or class but not {request_data.keys}")
+        return response_type, ws_socket_file, method_type, request_url, kwargs
+
+    def _wrap_response(self, response_type: str, response: Union[RequestsResponse, HttpxResponse]) -> Dict:
         if response_type == "empty":
             return {}
-        if not response:
+        if response.status_code >= 400:
             self.log.error(f"Uds-Mets-Server gives unexpected error. Response: {response.__dict__}")
             return {"error": response.text}
-        elif response_type == "text":
-            return {"text": response.text}
-        elif response_type == "class" or response_type == "dict":
-            return response.json()
-        else:
-            raise ValueError(f"Unexpected response_type: {response_type}")
+        return {"text": response.text}
@@ -141,8 +141,13 @@ config.add('OCRD_MAX_PROCESSOR_CACHE',
     parser=int,
     default=(True, 128))
 
+config.add('OCRD_IMAGE_CACHE_SIZE',
+    description="Maximum size (in MiB) of decoded images to be kept in memory for each workspace (least recently used first out), for repeated access to the same image files (e.g. in image_from_page). If 0, no images are cached.",
+    parser=int,
+    default=(True, 0))
+
 config.add('OCRD_MAX_PARALLEL_PAGES',
-    description="Maximum number of processor workers for page-parallel processing (within each Processor's selected page range, independent of the number of Processing Workers or Processor Servers). If set >1, then a METS Server must be used for METS synchronisation.",
+    description="Maximum number of processor workers for page-parallel processing (within each Processor's selected page range, independent of the number of Processing Workers or Processor Servers). If set >1, then METS changes are synchronised via METS Server (if used) or via the main process.",
     parser=int,
     default=(True, 1))
 
@@ -151,6 +156,53 @@ config.add('OCRD_PROCESSING_PAGE_TIMEOUT',
     parser=int,
     default=(True, 0))
 
+config.add('OCRD_MAX_PENDING_PAGES',
+    description="Maximum number of pages submitted for page-parallel processing at a time (i.e. queued or running). If 0, twice the number of processor workers.",
+    parser=int,
+    default=(True, 0))
+
+config.add('OCRD_MAX_PAGES_PER_WORKER',
+    description="Maximum number of pages processed by each processor worker before it gets replaced by a fresh one (to contain memory growth). If 0, workers are never replaced.",
+    parser=int,
+    default=(True, 0))
+
+config.add('OCRD_PROCESSING_PREFETCH_PAGES',
+    description="Number of pages ahead for which input files get downloaded concurrently (in background threads) while processing. If 0, download input files of each page only right before processing.",
+    parser=int,
+    default=(True, 0))
+
+config.add('OCRD_METS_SERVER_POOL_SIZE',
+    description="Maximum number of keep-alive connections each METS Server client keeps open (per process).",
+    parser=int,
+    default=(True, 4))
+
+config.add('OCRD_METS_CLIENT_CACHING',
+    description="If set to `true`, METS Server clients cache query results and revalidate them by the server's modification counter.",
+    default=(True, False),
+    validator=_validator_boolean,
+    parser=_parser_boolean)
+
+config.add('OCRD_METS_CLIENT_CACHE_MAX_AGE',
+    description="If METS Server clients cache query results, then re-query the server's modification counter at most this many seconds after it was last seen (in any response).",
+    parser=float,
+    default=(True, 1.0))
+
+config.add('OCRD_METS_SERVER_MSGPACK',
+    description="If set to `true`, METS Server clients request msgpack instead of JSON encoded responses.",
+    default=(True, True),
+    validator=_validator_boolean,
+    parser=_parser_boolean)
+
+config.add('OCRD_METS_SERVER_SAVE_INTERVAL',
+    description="If set >0, the METS Server writes unsaved changes to disk in the background at most this many seconds after the first unsaved modification.",
+    parser=float,
+    default=(True, 0))
+
+config.add('OCRD_METS_SERVER_SAVE_MUTATIONS',
+    description="If set >0, the METS Server writes unsaved changes to disk in the background as soon as this many modifications have accumulated.",
+    parser=int,
+    default=(True, 0))
+
 config.add("OCRD_PROFILE",
     description="""\
 Whether to enable gathering runtime statistics
@@ -273,6 +325,11 @@ config.add(
     default=(True, 0)
 )
 
+config.add("OCRD_NETWORK_METS_SERVER_LIVENESS_TTL",
+           description="For how many seconds a METS Server found running by the Processing Server is assumed to be still running (as long as its socket file exists) before checking its process or probing it again.",
+           parser=float,
+           default=(True, 10))
+
 config.add(name="OCRD_NETWORK_SOCKETS_ROOT_DIR",
            description="The root directory where all mets server related socket files are created",
            parser=lambda val: Path(val),
@@ -211,8 +211,8 @@ class AtomicWriterPerms(AtomicWriter):
         return f
 
 @contextmanager
-def atomic_write(fpath):
-    with atomic_write_(fpath, writer_cls=AtomicWriterPerms, overwrite=True) as f:
+def atomic_write(fpath, mode='w'):
+    with atomic_write_(fpath, writer_cls=AtomicWriterPerms, overwrite=True, mode=mode) as f:
         yield f
 
 
@@ -1,6 +1,8 @@
 """
 Validators for various OCR-D related data structures.
 """
+from typing import TYPE_CHECKING
+
 __all__ = [
     'ParameterValidator',
     'WorkspaceValidator',
@@ -17,7 +19,6 @@ __all__ = [
 
 from .parameter_validator import ParameterValidator
 from .workspace_validator import WorkspaceValidator
-from .page_validator import PageValidator
 from .ocrd_tool_validator import OcrdToolValidator
 from .resource_list_validator import OcrdResourceListValidator
 from .ocrd_zip_validator import OcrdZipValidator
@@ -26,3 +27,13 @@ from .xsd_mets_validator import XsdMetsValidator
 from .xsd_page_validator import XsdPageValidator
 from .processing_server_config_validator import ProcessingServerConfigValidator
 from .ocrd_network_message_validator import OcrdNetworkMessageValidator
+
+if TYPE_CHECKING:
+    from .page_validator import PageValidator
+
+def __getattr__(name):
+    # (needs the PAGE model, which is expensive to import)
+    if name == 'PageValidator':
+        from .page_validator import PageValidator
+        return PageValidator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,7 +11,6 @@ from ocrd_models.constants import PAGE_ALTIMG_FEATURES
 from ocrd_modelfactory import page_from_file
 
 from .constants import FILE_GROUP_CATEGORIES, FILE_GROUP_PREFIX
-from .page_validator import PageValidator
 from .xsd_page_validator import XsdPageValidator
 from .xsd_mets_validator import XsdMetsValidator
 
@@ -313,6 +312,8 @@ class WorkspaceValidator():
         Run PageValidator on the PAGE-XML documents referenced in the METS.
         """
         self.log.debug('_validate_page')
+        # (deferred, as the PAGE model is expensive to import)
+        from .page_validator import PageValidator
         for f in self.mets.find_files(mimetype=MIMETYPE_PAGE, **self.find_kwargs):
             if not f.local_filename and not self.download:
                 self.log.warning("Not available locally and 'download' is not set: %s", f)
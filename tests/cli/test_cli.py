@@ -0,0 +1,30 @@
+from subprocess import run
+from sys import executable
+
+from ocrd.cli import cli
+
+from tests.base import CapturingTestCase as TestCase, main
+
+class TestCli(TestCase):
+
+    def test_cli_lists_subcommands(self):
+        code, out, _ = self.invoke_cli(cli, ['--help'])
+        self.assertFalse(code)
+        for name in ['bashlib', 'log', 'network', 'ocrd-tool', 'process', 'resmgr', 'validate', 'workspace', 'zip']:
+            self.assertIn(f'  {name} ', out)
+
+    def test_cli_subcommands_lazy(self):
+        # needs a fresh interpreter, other tests import the subcommands
+        result = run([executable, '-c', '\n'.join([
+            'import sys',
+            'from ocrd.cli import cli',
+            'assert "ocrd.cli.network" not in sys.modules',
+            'assert "ocrd_network.processing_server" not in sys.modules',
+            'cli.main(args=["log", "--help"], standalone_mode=False)',
+            'assert "ocrd.cli.log" in sys.modules',
+            'assert "ocrd.cli.network" not in sys.modules',
+        ])], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    main(__file__)
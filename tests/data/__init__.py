@@ -1,4 +1,5 @@
 from functools import cached_property
+import ctypes
 import json
 import os
 from time import sleep
@@ -163,6 +164,13 @@ class DummyProcessorWithOutputSleep(Processor):
         sleep(self.parameter['sleep'])
         return OcrdPageResult(pcgts)
 
+class DummyProcessorWithOutputHang(DummyProcessorWithOutputSleep):
+    def process_page_pcgts(self, pcgts, page_id=None):
+        if page_id == self.workspace.mets.physical_pages[0]:
+            # block in C, so the interpreter cannot interrupt
+            ctypes.CDLL(None).sleep(60)
+        return super().process_page_pcgts(pcgts, page_id=page_id)
+
 class DummyProcessorWithOutputFailures(Processor):
     @cached_property
     def ocrd_tool(self):
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import sys
+from unittest import mock
 
 from PIL import Image, __version__ as pil_version
 
@@ -54,6 +55,24 @@ def test_ocrd_exif(path, width, height, xResolution, yResolution, resolution, re
     assert ocrd_exif.compression == compression
 
 
+@pytest.mark.parametrize("fmt,kwargs,xResolution,resolutionUnit", [
+    ('TIFF', {'dpi': (300, 300)}, 300, 'inches'),
+    ('TIFF', {'tiffinfo': {282: 28.3, 283: 28.3, 296: 3}}, 28, 'cm'),
+    ('PNG', {'dpi': (300, 300)}, 118, 'cm'),
+    ('PNG', {}, 1, 'inches'),
+    ('JPEG', {'dpi': (150, 150)}, 150, 'inches'),
+    ('JPEG', {}, 1, 'inches'),
+])
+def test_ocrd_exif_header(tmp_path, fmt, kwargs, xResolution, resolutionUnit):
+    """Check pixel density is read from file header without running identify"""
+    path = tmp_path / f'image.{fmt.lower()}'
+    Image.new('RGB', (20, 10)).save(path, format=fmt, **kwargs)
+    with Image.open(path) as img, mock.patch('ocrd_models.ocrd_exif.run') as run:
+        ocrd_exif = OcrdExif(img)
+    run.assert_not_called()
+    assert ocrd_exif.xResolution == ocrd_exif.yResolution == xResolution
+    assert ocrd_exif.resolutionUnit == resolutionUnit
+
 def test_ocrd_exif_serialize_xml():
     with Image.open(assets.path_to('SBB0000F29300010000/data/OCR-D-IMG/FILE_0001_IMAGE.tif')) as img:
         exif = OcrdExif(img)
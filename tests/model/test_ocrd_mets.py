@@ -19,7 +19,9 @@ from ocrd_utils import (
     MIMETYPE_PAGE
 )
 from ocrd_models import (
-    OcrdMets
+    OcrdMets,
+    RecordingOcrdMets,
+    SynchronizedOcrdMets
 )
 
 import pytest
@@ -133,6 +135,15 @@ def test_physical_pages_for_fileids(sbb_directory_ocrd_mets):
     assert sbb_directory_ocrd_mets.get_physical_pages(
         for_fileIds=['FILE_0002_IMAGE']) == ['PHYS_0002']
 
+def test_physical_pages_for_files(sbb_directory_ocrd_mets):
+    assert sbb_directory_ocrd_mets.get_physical_pages_for_files(
+        ['FILE_0005_IMAGE', 'FILE_0002_IMAGE', 'NOTEXIST']) == {
+            'FILE_0005_IMAGE': 'PHYS_0005', 'FILE_0002_IMAGE': 'PHYS_0002', 'NOTEXIST': None}
+    assert sbb_directory_ocrd_mets.get_physical_pages(
+        for_fileIds=['FILE_0002_IMAGE', 'FILE_0002_IMAGE']) == ['PHYS_0002', 'PHYS_0002']
+    divs = sbb_directory_ocrd_mets.get_physical_pages_for_files(['FILE_0002_IMAGE'], return_divs=True)
+    assert divs['FILE_0002_IMAGE'].get('ID') == 'PHYS_0002'
+
 def test_physical_pages_for_empty_fileids(sbb_directory_ocrd_mets):
     assert sbb_directory_ocrd_mets.get_physical_pages(
         for_fileIds=[]) == []
@@ -420,6 +431,126 @@ def test_update_physical_page_attributes(sbb_directory_ocrd_mets):
     assert b'ORDER' in m.to_xml()
     assert b'ORDERLABEL' in m.to_xml()
 
+def test_file_pageid_consistency(sbb_directory_ocrd_mets):
+    m = sbb_directory_ocrd_mets
+    f = next(m.find_files(ID='FILE_0002_IMAGE'))
+    assert f.pageId == 'PHYS_0002'
+    f.pageId = 'PHYS_0005'
+    assert f.pageId == 'PHYS_0005'
+    f.ID = 'FILE_0002_IMAGE_RENAMED'
+    assert f.pageId == 'PHYS_0005'
+    assert m.get_physical_pages(for_fileIds=['FILE_0002_IMAGE_RENAMED']) == ['PHYS_0005']
+    m.remove_physical_page_fptr('FILE_0002_IMAGE_RENAMED')
+    assert f.pageId is None
+    f2 = next(m.find_files(ID='FILE_0001_IMAGE'))
+    m.remove_physical_page('PHYS_0001')
+    assert f2.pageId is None
+    f3 = m.add_file('FOO', ID='foo1', pageId='PHYS_0002', mimetype='foo/bar')
+    assert f3.pageId == 'PHYS_0002'
+    m.remove_one_file('foo1')
+    assert f3.pageId is None
+
+def test_find_files_by_id_and_page(sbb_directory_ocrd_mets):
+    m = sbb_directory_ocrd_mets
+    assert [f.ID for f in m.find_files(ID='FILE_0002_IMAGE')] == ['FILE_0002_IMAGE']
+    assert [f.ID for f in m.find_files(ID='FILE_0002_IMAGE', fileGrp='OCR-D-IMG')] == ['FILE_0002_IMAGE']
+    assert [f.ID for f in m.find_files(ID='FILE_0002_IMAGE', fileGrp='//OCR-D-GT-.*')] == []
+    assert [f.ID for f in m.find_files(fileGrp='OCR-D-IMG', pageId='PHYS_0001..PHYS_0002,PHYS_0001')] == \
+        ['FILE_0001_IMAGE', 'FILE_0002_IMAGE']
+    f = next(m.find_files(ID='FILE_0002_IMAGE'))
+    f.ID = 'FILE_0002_IMAGE_RENAMED'
+    assert [f.ID for f in m.find_files(ID='FILE_0002_IMAGE')] == []
+    assert [f.ID for f in m.find_files(ID='FILE_0002_IMAGE_RENAMED', fileGrp='OCR-D-IMG')] == ['FILE_0002_IMAGE_RENAMED']
+    m.remove_one_file('FILE_0002_IMAGE_RENAMED')
+    assert [f.ID for f in m.find_files(ID='FILE_0002_IMAGE_RENAMED')] == []
+
+
+def test_find_files_page_order_cached():
+    mets = OcrdMets.empty_mets()
+    for fileGrp, page in [('G', 3), ('G', 1), ('G', 2), ('H', 2), ('H', 1)]:
+        mets.add_file(fileGrp, ID=f'{fileGrp}_{page}', mimetype='text/plain', pageId=f'P{page}')
+    results = []
+    for cache_flag in CACHING_ENABLED:
+        mets = OcrdMets(content=mets.to_xml(), cache_flag=cache_flag)
+        next(mets.find_files(ID='G_1')).ID = 'G_1_renamed'
+        next(mets.find_files(ID='G_1_renamed')).ID = 'G_1'
+        results.append(([f.ID for f in mets.find_files(pageId='P1..P3')],
+                        [f.ID for f in mets.find_files(fileGrp='G', pageId='P1..P3')],
+                        [f.ID for f in mets.find_files(pageId='P2,P1')]))
+    assert results[0] == results[1]
+    assert results[0] == (['G_3', 'G_1', 'G_2', 'H_2', 'H_1'],
+                          ['G_3', 'G_1', 'G_2'],
+                          ['G_1', 'G_2', 'H_2', 'H_1'])
+
+def test_to_xml_xmllint_unchanged():
+    from io import BytesIO
+    mets = OcrdMets.empty_mets()
+    mets.add_file('OUTPUT', ID='foo1', mimetype='text/plain', pageId='page1')
+    # some ignorable whitespace in unusual places
+    mets = OcrdMets(content=mets.to_xml().replace(b'<mets:file ', b'\n\n  <mets:file '))
+    before = mets.to_xml()
+    pretty = mets.to_xml(xmllint=True)
+    assert pretty != before
+    assert mets.to_xml() == before
+    with BytesIO() as f:
+        mets.write(f, xmllint=True)
+        assert f.getvalue() == pretty
+    assert mets.to_xml() == before
+
+def test_synchronized_file_setters():
+    from threading import Event, Thread
+    mets = SynchronizedOcrdMets(OcrdMets.empty_mets())
+    mets.add_file('OUTPUT', ID='foo1', mimetype='text/plain', pageId='page1')
+    f = next(mets.find_files(ID='foo1'))
+    assert f.mets is mets
+    assert [f.mets for f in mets.find_all_files()] == [mets]
+    locked, done = Event(), Event()
+    done_while_locked = []
+    def hold_lock():
+        with mets.lock:
+            locked.set()
+            done_while_locked.append(done.wait(0.5))
+    holder = Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    def set_attributes():
+        f.local_filename = 'foo/bar.txt'
+        f.pageId = 'page2'
+        done.set()
+    Thread(target=set_attributes).start()
+    holder.join()
+    assert done_while_locked == [False]
+    assert done.wait(1)
+    assert mets.mets.find_all_files(pageId='page2')[0].local_filename == 'foo/bar.txt'
+
+
+def test_recording_replay():
+    import pickle
+    original = OcrdMets.empty_mets(now='2000-01-01T00:00:00')
+    original.add_file('IN', ID='in1', mimetype='image/png', pageId='page1', local_filename='IN/in1.png')
+    original.add_file('IN', ID='in2', mimetype='image/png', pageId='page2', local_filename='IN/in2.png')
+    other = OcrdMets.empty_mets(now='2000-01-01T00:00:00')
+    other.add_file('OTHER', ID='other1', mimetype='text/plain', pageId='page1')
+    mets = RecordingOcrdMets(OcrdMets(content=original.to_xml()))
+    mets.unique_identifier = 'foo'
+    mets.add_agent(name='bar', _type='OTHER', othertype='SOFTWARE', role='CREATOR')
+    f = mets.add_file('OUT', ID='out1', mimetype='text/plain', pageId='page1')
+    f.local_filename = 'OUT/out1.txt'
+    f.url = 'http://example.org/out1.txt'
+    f.mimetype = 'application/xml'
+    f.pageId = 'page2'
+    f.ID = 'out1_renamed'
+    f = next(mets.find_files(ID='in2'))
+    f.local_filename = 'IN/in2.tif'
+    mets.set_physical_page_for_file('page3', f)
+    mets.remove_one_file(next(mets.find_files(ID='in1')))
+    mets.merge(other)
+    changes = pickle.loads(pickle.dumps(mets.pop_changes()))
+    assert not mets.pop_changes()
+    RecordingOcrdMets.replay(original, changes)
+    assert original.to_xml() == mets.to_xml()
+    assert [(f.ID, f.pageId) for f in original.find_files(fileGrp='//(OUT|OTHER)')] == \
+        [('out1_renamed', 'page2'), ('other1', 'page1')]
 
 if __name__ == '__main__':
     main(__file__)
@@ -219,6 +219,57 @@ del mets_c_10
 del mets_c_20
 del mets_c_50
 
+# ----- Lookups in large (cached) METS with up to 10k pages ----- #
+SCALING_PAGES = [100, 1000, 10000]
+SCALING_GRPS = ['OCR-D-IMG', 'OCR-D-BIN', 'OCR-D-SEG', 'OCR-D-OCR']
+
+def _build_large_mets(number_of_pages, cache_flag=True):
+    mets = OcrdMets.empty_mets(cache_flag=cache_flag)
+    for n in ['%05d' % (n + 1) for n in range(number_of_pages)]:
+        for grp in SCALING_GRPS:
+            mets.add_file(grp, mimetype='application/vnd.prima.page+xml',
+                          pageId='PHYS_%s' % n, ID='%s_%s' % (grp, n),
+                          local_filename='%s/%s_%s.xml' % (grp, grp, n))
+    return mets
+
+@fixture(scope='module', params=SCALING_PAGES, name='large_mets')
+def _fixture_large_mets(request):
+    yield request.param, _build_large_mets(request.param)
+
+@mark.benchmark(group="scaling-id")
+def test_scaling_find_by_id(benchmark, large_mets):
+    number_of_pages, mets = large_mets
+    last = '%05d' % number_of_pages
+    @benchmark
+    def ret():
+        assert_len(1, mets, dict(ID='OCR-D-OCR_%s' % last))
+        assert_len(0, mets, dict(ID='OCR-D-OCR_%s-NOTEXIST' % last))
+
+@mark.benchmark(group="scaling-page")
+def test_scaling_find_by_page_range(benchmark, large_mets):
+    number_of_pages, mets = large_mets
+    first, last = '%05d' % (number_of_pages - 9), '%05d' % number_of_pages
+    @benchmark
+    def ret():
+        assert_len(10 * len(SCALING_GRPS), mets, dict(pageId='PHYS_%s..PHYS_%s' % (first, last)))
+
+@mark.benchmark(group="scaling-filegrp-page")
+def test_scaling_find_by_filegrp_page(benchmark, large_mets):
+    number_of_pages, mets = large_mets
+    last = '%05d' % number_of_pages
+    @benchmark
+    def ret():
+        assert_len(1, mets, dict(fileGrp='OCR-D-SEG', pageId='PHYS_%s' % last))
+
+@mark.benchmark(group="scaling-pageid")
+def test_scaling_file_pageid(benchmark, large_mets):
+    number_of_pages, mets = large_mets
+    last = '%05d' % number_of_pages
+    ocrd_file = next(mets.find_files(ID='OCR-D-OCR_%s' % last))
+    @benchmark
+    def ret():
+        assert ocrd_file.pageId == 'PHYS_%s' % last
+
 def manual_t():
     mets = _build_mets(2, cache_flag=False)
     mets_cached = _build_mets(2, cache_flag=True)    
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from io import BytesIO
+from subprocess import run
+from sys import executable
+
 import pytest
 
 from tests.base import main, assets, create_ocrd_file_with_defaults
@@ -19,6 +23,8 @@ from ocrd_models.ocrd_page import (
     WordType,
     GlyphType,
 
+    OcrdPage,
+    parseEtree,
     parseString,
     parse,
     to_xml
@@ -475,5 +481,35 @@ def test_id():
     assert pcgts.get_Page().id == 'OCR-D-IMG_INPUT_0017.tif'
 
 
+def test_xpath():
+    pages = []
+    for _ in range(2):
+        revmap = {}
+        page = OcrdPage(*parseEtree(BytesIO(simple_page.encode('utf-8')), reverse_mapping=revmap, silence=True))
+        page.revmap = revmap
+        pages.append(page)
+    # context only built when queried
+    assert pages[0]._xpath_context is None
+    for page in pages:
+        nodes = page.xpath('//page:Word[pc:pixelarea(.) > 20000]')
+        assert [page.revmap[node].id for node in nodes] == ['w_w1aab1b1b2b1b1ab1']
+        assert page.xpath('count(//page:TextLine)') == 1
+    assert pages[0].xpath_parser is pages[1].xpath_parser
+
+
+def test_lazy_generateds():
+    # needs a fresh interpreter, other tests import the model
+    result = run([executable, '-c', '\n'.join([
+        'import sys',
+        'import ocrd',
+        'assert "ocrd_models.ocrd_page_generateds" not in sys.modules',
+        'assert "elementpath" not in sys.modules',
+        'from ocrd_models.ocrd_page import TextRegionType, parse',
+        'assert "ocrd_models.ocrd_page_generateds" in sys.modules',
+        'assert parse.__doc__.startswith("Parse a file")',
+    ])], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
 if __name__ == '__main__':
     main(__file__)
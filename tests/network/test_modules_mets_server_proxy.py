@@ -1,10 +1,21 @@
+from asyncio import gather, run
+from json import loads
 from os.path import abspath, dirname, exists, join
 from pathlib import Path
+from psutil import Process
 from pytest import fixture
 from shutil import rmtree, copytree
-from src.ocrd.mets_server import OcrdAgentModel, OcrdFileModel, MpxReq
+from time import sleep
+from types import SimpleNamespace
+from unittest import mock
+from ocrd import OcrdMetsServer
+from ocrd_models import OcrdMets
+from ocrd_utils import getLogger
+from src.ocrd.mets_server import OcrdAgentModel, OcrdFileModel, OcrdFileAddListModel, MpxReq
+from src.ocrd_network.processing_server import ProcessingServer
 from src.ocrd_network.tcp_to_uds_mets_proxy import MetsServerProxy
 from src.ocrd_network.runtime_data import Deployer
+from src.ocrd_network.utils import convert_url_to_uds_format
 from tests.base import assets
 
 PS_CONFIG_PATH = str(join(abspath(dirname(__file__)), "ps_config.yml"))
@@ -45,6 +56,55 @@ def test_file_groups(start_uds_mets_server):
     assert len(file_groups) == 17
 
 
+def test_generation(start_uds_mets_server):
+    request_body = MpxReq.generation(TEST_WORKSPACE_DIR)
+    response_dict = MetsServerProxy().forward_tcp_request(request_body=request_body)
+    assert response_dict["text"] == "0"
+
+
+def test_find_files_async(start_uds_mets_server):
+    proxy = MetsServerProxy()
+    async def forward_concurrently():
+        request_body = MpxReq.find_files(TEST_WORKSPACE_DIR, {"file_grp": "OCR-D-IMG"})
+        responses = await gather(*[proxy.forward_tcp_request_async(request_body=request_body)
+                                   for _ in range(10)])
+        text_response = await proxy.forward_tcp_request_async(
+            request_body=MpxReq.workspace_path(TEST_WORKSPACE_DIR))
+        await proxy.close_async_clients()
+        return responses, text_response
+    responses, text_response = run(forward_concurrently())
+    expected = proxy.forward_tcp_request(request_body=MpxReq.find_files(TEST_WORKSPACE_DIR, {"file_grp": "OCR-D-IMG"}))
+    assert all(loads(response.body) == expected for response in responses)
+    assert text_response["text"] == TEST_WORKSPACE_DIR
+    assert not proxy.async_clients
+
+
+def test_forward_concurrently_not_started(tmp_path):
+    ws_dir_path = str(tmp_path)
+    (tmp_path / "mets.xml").write_bytes(OcrdMets.empty_mets().to_xml())
+    deployer = Deployer(config_path=PS_CONFIG_PATH)
+    # only the attributes used by the handler
+    processing_server = SimpleNamespace(
+        deployer=deployer, mets_server_proxy=MetsServerProxy(), log=getLogger("ocrd_network.test"))
+    request = mock.Mock(headers={})
+    request.json = mock.AsyncMock(return_value=MpxReq.workspace_path(ws_dir_path))
+    async def forward_concurrently():
+        responses = await gather(*[ProcessingServer.forward_tcp_request_to_uds_mets_server(processing_server, request)
+                                   for _ in range(5)])
+        await processing_server.mets_server_proxy.close_async_clients()
+        return responses
+    with mock.patch.object(OcrdMetsServer, "create_process", wraps=OcrdMetsServer.create_process) as create_process:
+        try:
+            responses = run(forward_concurrently())
+        finally:
+            if deployer.mets_servers:
+                mets_server_url = convert_url_to_uds_format(next(iter(deployer.mets_servers)))
+                deployer.stop_uds_mets_server(mets_server_url, path_to_mets=str(tmp_path / "mets.xml"))
+    # only one mets server for the workspace
+    assert create_process.call_count == 1
+    assert all(response["text"] == ws_dir_path for response in responses)
+
+
 def test_add_agent(start_uds_mets_server):
     test_agent_name = "Module test agent"
     test_agent_type = "Tester type"
@@ -111,6 +171,24 @@ def test_add_file_error(start_uds_mets_server):
     assert "error" in response_dict, "Response should contain key 'error' to indicate failure"
 
 
+def test_add_files(start_uds_mets_server):
+    test_file_group = "OCR-D-FOO"
+    ocrd_file_list_model = OcrdFileAddListModel(files=[
+        OcrdFileModel.create(
+            file_id=f"test-file-id-{i}",
+            file_grp=test_file_group,
+            page_id="PHYS_5555",
+            mimetype="Test mimetype",
+            url=None,
+            local_filename=f"Test local filename {i}"
+        ).dict() for i in range(3)
+    ])
+    request_body = MpxReq.add_files(TEST_WORKSPACE_DIR, ocrd_file_list_model.dict())
+    response_dict = MetsServerProxy().forward_tcp_request(request_body=request_body)
+    assert [f["file_id"] for f in response_dict["files"]] == [f"test-file-id-{i}" for i in range(3)]
+    assert all(f["file_grp"] == test_file_group for f in response_dict["files"])
+
+
 def test_find_files(start_uds_mets_server):
     test_file_group = "OCR-D-IMG"
     test_non_existing_file_group = "FOO-D-FOO"
@@ -126,3 +204,27 @@ def test_find_files(start_uds_mets_server):
     )
     response_dict = MetsServerProxy().forward_tcp_request(request_body=request_body)
     assert len(response_dict["files"]) == 0, "Expected to find no matching files but found some"
+
+
+def test_mets_server_registry():
+    ws_dir = TEST_WORKSPACE_DIR + "-registry"
+    rmtree(ws_dir, ignore_errors=True)
+    copytree(assets.path_to(WORKSPACE_ASSET_PATH), ws_dir)
+    deployer = Deployer(config_path=PS_CONFIG_PATH)
+    mets_server_url = str(deployer.start_uds_mets_server(ws_dir_path=ws_dir))
+    for _ in range(50):
+        if exists(mets_server_url):
+            break
+        sleep(0.1)
+    # known to be running: not probed again
+    with mock.patch("src.ocrd_network.runtime_data.deployer.is_mets_server_running") as probe:
+        assert str(deployer.start_uds_mets_server(ws_dir_path=ws_dir)) == mets_server_url
+        assert not probe.called
+    # process exit removes it from the registry
+    Process(deployer.mets_servers[mets_server_url]).kill()
+    for _ in range(50):
+        if not deployer.is_mets_server_registered(mets_server_url):
+            break
+        sleep(0.1)
+    assert not deployer.is_mets_server_registered(mets_server_url)
+    rmtree(ws_dir, ignore_errors=True)
@@ -15,6 +15,7 @@ from tests.data import (
     DummyProcessorWithOutputDocfile,
     DummyProcessorWithOutputLegacy,
     DummyProcessorWithOutputSleep,
+    DummyProcessorWithOutputHang,
     DummyProcessorWithOutputFailures,
     DummyProcessorWithOutputMultiInput,
     IncompleteProcessor
@@ -24,8 +25,9 @@ from tests.test_mets_server import fixture_start_mets_server
 from ocrd_utils import MIMETYPE_PAGE, pushd_popd, initLogging, disableLogging, config
 from ocrd_modelfactory import page_from_file
 from ocrd_models.ocrd_page import to_xml
+from ocrd_models.ocrd_mets import RecordingOcrdMets, SynchronizedOcrdMets
 from ocrd.resolver import Resolver
-from ocrd.processor import Processor, run_processor, run_cli, NonUniqueInputFile
+from ocrd.processor import Processor, run_processor, run_cli, NonUniqueInputFile, share_array
 from ocrd.processor.helpers import get_processor
 
 from unittest import mock
@@ -586,6 +588,32 @@ def test_run_output_logging(workspace_sbb, caplog):
     msg = caplog.records[0].message
     assert msg.startswith("Executing processor 'ocrd-test' took")
 
+def test_run_output_progress(workspace_sbb):
+    progresses = []
+    run_processor(DummyProcessorWithOutputSleep, workspace=workspace_sbb,
+                  input_file_grp="OCR-D-IMG",
+                  output_file_grp="OCR-D-OUT",
+                  parameter={"sleep": 0},
+                  progress_callback=lambda progress: progresses.append((progress.nr_done, progress.eta)))
+    nr_pages = len(workspace_sbb.mets.find_all_files(fileGrp="OCR-D-IMG"))
+    assert [nr_done for nr_done, _ in progresses] == list(range(1, nr_pages + 1))
+    assert progresses[-1][1] == 0
+
+def test_run_output_progress_cached(workspace_sbb):
+    progresses = []
+    kwargs = dict(workspace=workspace_sbb,
+                  input_file_grp="OCR-D-IMG",
+                  parameter={"sleep": 0},
+                  instance_caching=True)
+    run_processor(DummyProcessorWithOutputSleep, output_file_grp="OCR-D-OUT",
+                  progress_callback=lambda progress: progresses.append(progress.nr_done),
+                  **kwargs)
+    nr_pages = len(progresses)
+    assert nr_pages
+    # the cached instance must not report to the earlier run's callback
+    run_processor(DummyProcessorWithOutputSleep, output_file_grp="OCR-D-OUT2", **kwargs)
+    assert len(progresses) == nr_pages
+
 def test_run_output_metsserver(start_mets_server):
     mets_server_url, ws = start_mets_server
     assert len(ws.mets.find_all_files(fileGrp="OCR-D-OUT")) == 0
@@ -648,6 +676,67 @@ def test_run_output_parallel(start_mets_server):
     assert len(ws.mets.find_all_files(fileGrp="OCR-D-OUT")) == len(ws.mets.find_all_files(fileGrp="OCR-D-IMG"))
     config.reset_defaults()
 
+def test_run_output_parallel_pending(start_mets_server):
+    import time
+    mets_server_url, ws = start_mets_server
+    # do not raise for number of failures:
+    config.OCRD_MAX_MISSING_OUTPUTS = -1
+    config.OCRD_MAX_PARALLEL_PAGES = 2
+    config.OCRD_MAX_PENDING_PAGES = 2
+    start_time = time.time()
+    run_processor(DummyProcessorWithOutputSleep, workspace=ws,
+                  input_file_grp="OCR-D-IMG",
+                  output_file_grp="OCR-D-OUT",
+                  parameter={"sleep": 1},
+                  mets_server_url=mets_server_url)
+    run_time = time.time() - start_time
+    # 3 pages in 2 rounds
+    assert 2 < run_time < 3.5, f"run_processor took {run_time}s"
+    assert len(ws.mets.find_all_files(fileGrp="OCR-D-OUT")) == len(ws.mets.find_all_files(fileGrp="OCR-D-IMG"))
+    config.reset_defaults()
+
+def test_run_output_parallel_hang(start_mets_server):
+    import time
+    import ocrd.processor.base
+    mets_server_url, ws = start_mets_server
+    # do not raise for number of failures:
+    config.OCRD_MAX_MISSING_OUTPUTS = -1
+    config.OCRD_MISSING_OUTPUT = 'SKIP'
+    config.OCRD_PROCESSING_PAGE_TIMEOUT = 2
+    config.OCRD_MAX_PARALLEL_PAGES = 2
+    config.OCRD_MAX_PAGES_PER_WORKER = 1
+    start_time = time.time()
+    with mock.patch.object(ocrd.processor.base, 'PAGE_WORKER_KILL_GRACE', 1):
+        run_processor(DummyProcessorWithOutputHang, workspace=ws,
+                      input_file_grp="OCR-D-IMG",
+                      output_file_grp="OCR-D-OUT",
+                      parameter={"sleep": 0},
+                      mets_server_url=mets_server_url)
+    run_time = time.time() - start_time
+    # first page killed after timeout plus grace, other pages done
+    assert run_time < 10, f"run_processor took {run_time}s"
+    assert len(ws.mets.find_all_files(fileGrp="OCR-D-OUT")) == len(ws.mets.find_all_files(fileGrp="OCR-D-IMG")) - 1
+    config.reset_defaults()
+
+def _getpid_after(seconds):
+    import os
+    import time
+    time.sleep(seconds)
+    return os.getpid()
+
+def test_page_worker_pool_recycle():
+    import multiprocessing as mp
+    from ocrd.processor.base import PageWorkerPool
+    pool = PageWorkerPool(max_workers=2, max_pages=1, context=mp.get_context('fork'))
+    tasks = [pool.submit(_getpid_after, 0.5) for _ in range(5)]
+    # only the first round got submitted, the rest waits for its workers to drain
+    assert len(pool._backlog) == 3
+    pids = [task.result(timeout=30) for task in tasks]
+    # each round on fresh workers
+    assert not set(pids[:2]) & set(pids[2:])
+    assert not set(pids[2:4]) & set(pids[4:])
+    pool.shutdown(wait=True)
+
 def test_run_output_parallel_caching(start_mets_server):
     import time
     mets_server_url, ws = start_mets_server
@@ -676,5 +765,90 @@ def test_run_output_parallel_caching(start_mets_server):
     assert run_time < 1.5, f"run_processor took {run_time}s"
     config.reset_defaults()
 
+def test_run_output_parallel_local(workspace_sbb):
+    import time
+    config.OCRD_MAX_PARALLEL_PAGES = 3
+    start_time = time.time()
+    # without METS Server, but forking
+    run_processor(DummyProcessorWithOutputSleep, workspace=workspace_sbb,
+                  input_file_grp="OCR-D-IMG",
+                  output_file_grp="OCR-D-OUT",
+                  parameter={"sleep": 1})
+    run_time = time.time() - start_time
+    assert run_time < 3, f"run_processor took {run_time}s"
+    assert not isinstance(workspace_sbb.mets, RecordingOcrdMets)
+    assert len(workspace_sbb.mets.find_all_files(fileGrp="OCR-D-OUT")) == len(workspace_sbb.mets.find_all_files(fileGrp="OCR-D-IMG"))
+    config.reset_defaults()
+
+def test_run_output_parallel_threads(workspace_sbb):
+    import time
+    config.OCRD_MAX_PARALLEL_PAGES = 3
+    start_time = time.time()
+    # without METS Server
+    with mock.patch.object(DummyProcessorWithOutputSleep, 'parallel_threads', True):
+        run_processor(DummyProcessorWithOutputSleep, workspace=workspace_sbb,
+                      input_file_grp="OCR-D-IMG",
+                      output_file_grp="OCR-D-OUT",
+                      parameter={"sleep": 1})
+    run_time = time.time() - start_time
+    assert run_time < 1.5, f"run_processor took {run_time}s"
+    assert not isinstance(workspace_sbb.mets, SynchronizedOcrdMets)
+    assert len(workspace_sbb.mets.find_all_files(fileGrp="OCR-D-OUT")) == len(workspace_sbb.mets.find_all_files(fileGrp="OCR-D-IMG"))
+    config.reset_defaults()
+
+def test_share_array_resource(tmp_path):
+    import numpy as np
+    from multiprocessing import get_context
+    array = share_array(np.arange(12, dtype=np.float32).reshape(3, 4))
+    assert array.shape == (3, 4)
+    assert array[2, 3] == 11
+    assert not array.flags.writeable
+    # forked processes write to the same physical memory
+    def modify():
+        np.frombuffer(array.base, dtype=np.float32)[0] = 42
+    child = get_context('fork').Process(target=modify)
+    child.start()
+    child.join()
+    assert array[0, 0] == 42
+    with pytest.raises(ValueError):
+        share_array(np.array([{}]))
+    resource = tmp_path / 'model.bin'
+    resource.write_bytes(b'weights')
+    proc = DummyProcessor(None)
+    with proc.share_resource(str(resource)) as mapped:
+        assert mapped[:] == b'weights'
+
+def test_run_output_prefetch(tmp_path):
+    class DummyProcessorWithOutputDownload(DummyProcessorWithOutputSleep):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.download = True
+    remote = tmp_path / 'remote'
+    remote.mkdir()
+    ws = Resolver().workspace_from_nothing(directory=str(tmp_path / 'ws'))
+    for i in range(1, 6):
+        Image.new('RGB', (10, 10)).save(remote / f'{i}.png')
+        ws.add_file('OCR-D-IMG', file_id=f'IMG_{i}', page_id=f'phys_{i}', mimetype='image/png',
+                    url=str(remote / f'{i}.png'))
+    config.OCRD_PROCESSING_PREFETCH_PAGES = 2
+    from threading import current_thread
+    download_threads = []
+    download_to_directory = ws.resolver.download_to_directory
+    def download_to_directory_in_thread(*args, **kwargs):
+        download_threads.append(current_thread().name)
+        return download_to_directory(*args, **kwargs)
+    with mock.patch.object(ws.resolver, 'download_to_directory', download_to_directory_in_thread):
+        run_processor(DummyProcessorWithOutputDownload, workspace=ws,
+                      input_file_grp="OCR-D-IMG",
+                      output_file_grp="OCR-D-OUT",
+                      parameter={"sleep": 0})
+    config.reset_defaults()
+    # downloaded ahead of time only
+    assert len(download_threads) == 5
+    assert all(name.startswith('ocrd-prefetch') for name in download_threads)
+    assert len(ws.mets.find_all_files(fileGrp="OCR-D-OUT")) == 5
+    for input_file in ws.mets.find_files(fileGrp="OCR-D-IMG"):
+        assert Path(ws.directory, input_file.local_filename).exists()
+
 if __name__ == "__main__":
     main(__file__)
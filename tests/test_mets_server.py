@@ -6,6 +6,8 @@ from tests.base import assets
 
 from itertools import repeat
 from multiprocessing import Process, Pool, Pipe, set_start_method
+from threading import Thread
+from unittest import mock
 try:
     # necessary for macos
     set_start_method("fork")
@@ -19,9 +21,12 @@ from pathlib import Path
 import stat
 from uuid import uuid4
 
+from requests import Response
 from requests.exceptions import ConnectionError
+import msgpack
 
 from ocrd import Resolver, OcrdMetsServer, Workspace
+from ocrd.mets_server import ClientSideOcrdMets
 from ocrd_utils import pushd_popd, MIMETYPE_PAGE, initLogging, setOverrideLogLevel, disableLogging, getLogger
 
 TRANSPORTS = ['/tmp/ocrd-mets-server.sock', 'http://127.0.0.1:12345']
@@ -147,6 +152,39 @@ def test_mets_server_add_file_overwrite(start_mets_server):
     add_file_server((mets_server_url, workspace_server.directory, 5), force=True)
     assert len(workspace_server.mets.find_all_files(fileGrp='FOO')) == 1
 
+def test_mets_server_add_files(start_mets_server):
+    mets_server_url, workspace_server = start_mets_server
+
+    added = workspace_server.mets.add_files([
+        dict(fileGrp='FOO', ID=f'FOO_page{i}', pageId=f'page{i}', mimetype=MIMETYPE_PAGE, local_filename=f'FOO/page{i}.xml')
+        for i in range(10)
+    ])
+    assert [f.ID for f in added] == [f'FOO_page{i}' for i in range(10)]
+    assert [f.pageId for f in workspace_server.mets.find_files(fileGrp='FOO')] == [f'page{i}' for i in range(10)]
+
+    with raises(RuntimeError, match="already exists"):
+        workspace_server.mets.add_files([dict(fileGrp='FOO', ID='FOO_page5', pageId='page5', mimetype=MIMETYPE_PAGE)])
+    workspace_server.mets.add_files([dict(fileGrp='FOO', ID='FOO_page5', pageId='page5', mimetype=MIMETYPE_PAGE, force=True)])
+    assert len(workspace_server.mets.find_all_files(fileGrp='FOO')) == 10
+
+    # all or nothing
+    with raises(RuntimeError, match="already exists"):
+        workspace_server.mets.add_files([
+            dict(fileGrp='BAR', ID='BAR_page1', pageId='page1', mimetype=MIMETYPE_PAGE),
+            dict(fileGrp='FOO', ID='FOO_page1', pageId='page1', mimetype=MIMETYPE_PAGE, force=True),
+            dict(fileGrp='FOO', ID='FOO_page2', pageId='page2', mimetype=MIMETYPE_PAGE),
+        ])
+    assert 'BAR' not in workspace_server.mets.file_groups
+    assert [f.pageId for f in workspace_server.mets.find_files(fileGrp='FOO', ID='FOO_page1')] == ['page1']
+    assert len(workspace_server.mets.find_all_files(fileGrp='FOO')) == 10
+
+    # batched add_file calls
+    with workspace_server.mets.batch():
+        workspace_server.mets.add_file('BAR', ID='BAR_page1', pageId='page1', mimetype=MIMETYPE_PAGE)
+        workspace_server.mets.add_file('BAR', ID='BAR_page2', pageId='page2', mimetype=MIMETYPE_PAGE)
+        assert 'BAR' not in workspace_server.mets.file_groups
+    assert len(workspace_server.mets.find_all_files(fileGrp='BAR')) == 2
+
 def test_mets_server_add_agents(start_mets_server):
     NO_AGENTS = 30
 
@@ -278,3 +316,124 @@ def test_reload(start_mets_server : Tuple[str, Workspace]):
     print(workspace_server.mets.reload())
     assert len(workspace_server.mets.find_all_files()) == 36, '36 files total'
 
+
+def test_mets_server_session_pooled(start_mets_server : Tuple[str, Workspace]):
+    _, workspace_server = start_mets_server
+    session = workspace_server.mets.session
+    assert workspace_server.mets.session is session
+    assert len(workspace_server.mets.find_all_files()) == 35
+    assert workspace_server.mets.session is session
+    # forked children must not share the parent's connections
+    parent_conn, child_conn = Pipe()
+    def child():
+        child_conn.send((workspace_server.mets.session is session,
+                         len(workspace_server.mets.find_all_files())))
+    p = Process(target=child)
+    p.start()
+    p.join()
+    assert parent_conn.recv() == (False, 35)
+    assert workspace_server.mets.session is session
+
+def test_find_files_streamed(start_mets_server : Tuple[str, Workspace]):
+    _, workspace_server = start_mets_server
+    mets = workspace_server.mets
+    files = mets.find_files(fileGrp='OCR-D-IMG')
+    assert next(files).ID == 'FILE_0001_IMAGE'
+    # abandoning the generator must not block subsequent requests
+    del files
+    assert [f.pageId for f in mets.find_files(fileGrp='OCR-D-IMG')] == ['PHYS_0001', 'PHYS_0002', 'PHYS_0005']
+    with raises(RuntimeError, match="Failed to find files"):
+        mets.find_all_files(pageId='PHYS_0001-NOTEXIST')
+
+def test_mets_server_add_files_error_body():
+    mets = ClientSideOcrdMets('/tmp/ocrd-mets-server-unused.sock')
+    # like a 5xx from uvicorn or a proxy in between
+    response = Response()
+    response.status_code = 502
+    response._content = b'Bad Gateway'
+    with mock.patch.object(mets.session, 'request', return_value=response):
+        with raises(RuntimeError, match="Bad Gateway"):
+            mets.add_files([dict(fileGrp='FOO', ID='FOO_1', mimetype=MIMETYPE_PAGE, pageId='page1', local_filename='FOO/1.xml')])
+
+def test_find_files_stream_fallback(start_mets_server : Tuple[str, Workspace]):
+    _, workspace_server = start_mets_server
+    mets = workspace_server.mets
+    request = mets.session.request
+    def request_without_stream(method, url, **kwargs):
+        # like a server without GET /file/stream
+        return request(method, url.replace('/file/stream', '/file/notfound'), **kwargs)
+    with mock.patch.object(mets.session, 'request', request_without_stream):
+        assert [f.pageId for f in mets.find_files(fileGrp='OCR-D-IMG')] == ['PHYS_0001', 'PHYS_0002', 'PHYS_0005']
+    assert not mets._stream_files
+
+def test_client_cache_streamed(start_mets_server : Tuple[str, Workspace]):
+    mets_server_url, workspace_server = start_mets_server
+    mets_cached = ClientSideOcrdMets(mets_server_url, workspace_server.directory, cache_flag=True)
+    files = mets_cached.find_files(fileGrp='OCR-D-IMG')
+    assert next(files).ID == 'FILE_0001_IMAGE'
+    # only cached once complete
+    assert not mets_cached._cache
+    assert [f.ID for f in files] == ['FILE_0002_IMAGE', 'FILE_0005_IMAGE']
+    assert len(mets_cached._cache) == 1
+
+def test_client_cache(start_mets_server : Tuple[str, Workspace]):
+    mets_server_url, workspace_server = start_mets_server
+    mets_cached = ClientSideOcrdMets(mets_server_url, workspace_server.directory, cache_flag=True)
+    generation = mets_cached.generation
+    assert len(mets_cached.find_all_files(fileGrp='OCR-D-IMG')) == 3
+    assert 'FOO' not in mets_cached.file_groups
+    assert len(mets_cached.physical_pages) == 3
+    assert mets_cached._cache_generation == generation
+    # modification via another client invalidates
+    add_file_server((mets_server_url, workspace_server.directory, 5))
+    assert mets_cached.generation == generation + 1
+    assert 'FOO' in mets_cached.file_groups
+    assert len(mets_cached.physical_pages) == 4
+    assert len(mets_cached.find_all_files(fileGrp='FOO')) == 1
+    assert mets_cached._cache_generation == generation + 1
+    # no extra round-trip while the generation has been seen recently
+    with mock.patch.object(ClientSideOcrdMets, 'generation', new_callable=mock.PropertyMock) as generation_mock:
+        assert len(mets_cached.physical_pages) == 4
+        generation_mock.assert_not_called()
+    # own modifications invalidate immediately
+    mets_cached.add_file('BAR', ID='BAR_page1', mimetype=MIMETYPE_PAGE, pageId='page1', local_filename='BAR/page1.xml')
+    assert 'BAR' in mets_cached.file_groups
+
+def test_msgpack_negotiation(start_mets_server : Tuple[str, Workspace]):
+    _, workspace_server = start_mets_server
+    mets = workspace_server.mets
+    r = mets.session.get(f'{mets.url}/file', params={'file_grp': 'OCR-D-IMG'}, headers={'Accept': 'application/msgpack'})
+    assert r.headers['content-type'] == 'application/msgpack'
+    assert len(msgpack.unpackb(r.content)['files']) == 3
+    r = mets.session.get(f'{mets.url}/file', params={'file_grp': 'OCR-D-IMG'}, headers={'Accept': 'application/json'})
+    assert r.headers['content-type'] == 'application/json'
+    assert len(r.json()['files']) == 3
+    # both encodings of the streamed variant
+    assert [f.ID for f in mets.find_files(fileGrp='OCR-D-IMG')] == ['FILE_0001_IMAGE', 'FILE_0002_IMAGE', 'FILE_0005_IMAGE']
+    mets.session.headers['Accept'] = 'application/json'
+    assert [f.ID for f in mets.find_files(fileGrp='OCR-D-IMG')] == ['FILE_0001_IMAGE', 'FILE_0002_IMAGE', 'FILE_0005_IMAGE']
+
+def test_write_behind(tmpdir):
+    copytree(assets.path_to('SBB0000F29300010000/data'), str(tmpdir), dirs_exist_ok=True)
+    server = OcrdMetsServer(workspace=Workspace(Resolver(), str(tmpdir)), url='/tmp/ocrd-mets-server-unused.sock')
+    def saved_ids():
+        return [f.ID for f in Workspace(Resolver(), str(tmpdir)).mets.find_files(fileGrp='FOO')]
+    # save after 2 modifications, or 1s after the first one
+    write_behind = Thread(target=server._write_behind, args=(1.0, 2), daemon=True)
+    write_behind.start()
+    for i in range(1, 4):
+        with server._mets_lock:
+            server.workspace.add_file('FOO', ID=f'FOO_{i}', pageId='PHYS_0001', mimetype=MIMETYPE_PAGE)
+            server._modified()
+        sleep(0.3)
+        if i == 1:
+            assert saved_ids() == []
+    assert saved_ids() == ['FOO_1', 'FOO_2']
+    assert server.dirty == 1
+    sleep(1)
+    assert saved_ids() == ['FOO_1', 'FOO_2', 'FOO_3']
+    assert server.dirty == 0
+    with server._mets_lock:
+        server._stopping = True
+        server._mets_lock.notify()
+    write_behind.join()
@@ -1,4 +1,10 @@
-from tests.base import TestCase, main, assets, create_ocrd_file, create_ocrd_file_with_defaults
+from os import utime
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+from tests.base import TestCase, main, assets, copy_of_directory, create_ocrd_file, create_ocrd_file_with_defaults
 
 from ocrd_utils import MIMETYPE_PAGE
 from ocrd_models import OcrdMets
@@ -18,6 +24,19 @@ class TestModelFactory(TestCase):
         with self.assertRaisesRegex(Exception, "Must pass 'image_filename' to 'exif_from_filename'"):
             exif_from_filename(None)
 
+    def test_exif_from_filename_cached(self):
+        with copy_of_directory(assets.path_to('kant_aufklaerung_1784/data')) as workdir:
+            path = Path(workdir, 'OCR-D-IMG', 'INPUT_0017.tif')
+            exif1 = exif_from_filename(str(path))
+            with mock.patch('ocrd_modelfactory.Image.open') as image_open:
+                exif2 = exif_from_filename(str(path))
+            image_open.assert_not_called()
+            self.assertEqual(exif1.to_xml(), exif2.to_xml())
+            # cache invalidated by modification
+            Image.new('L', (10, 20)).save(path)
+            utime(path, ns=(0, 0))
+            self.assertEqual(exif_from_filename(str(path)).width, 10)
+
     def test_page_from_file(self):
         f = create_ocrd_file_with_defaults(mimetype='image/tiff', local_filename=SAMPLE_IMG, ID='file1')
         self.assertEqual(f.mimetype, 'image/tiff')
@@ -3,6 +3,7 @@ from tempfile import TemporaryDirectory, gettempdir
 from pathlib import Path
 
 from PIL import Image
+from lxml import etree as ET
 
 from tests.base import TestCase, main, assets, create_ocrd_file
 from pytest import raises, warns
@@ -47,7 +48,7 @@ from ocrd_utils import (
     MIME_TO_EXT, EXT_TO_MIME,
     MIME_TO_PIL, PIL_TO_MIME,
 )
-from ocrd_models.utils import xmllint_format
+from ocrd_models.utils import xmllint_format, remove_blank_text, XMLLINT_DECLARATION
 from ocrd_models import OcrdMets
 
 
@@ -101,6 +102,17 @@ def test_xmllint():
     pretty_xml = xmllint_format(xml_str).decode('utf-8')
     assert pretty_xml == '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_str
 
+def test_remove_blank_text():
+    for xml_str in [
+        '<beep>\n  <boop>42</boop>\n</beep>\n',
+        '<a>\n <b> </b>\n <c><d/> <e/>\n</c> <!-- c -->\n <f xml:space="preserve"> <g/> </f>\n</a>',
+        '<a><b/> <c/>mixed<d/> <e/> </a>',
+    ]:
+        root = ET.fromstring(xml_str)
+        remove_blank_text(root)
+        pretty_xml = XMLLINT_DECLARATION + ET.tostring(root, pretty_print=True, encoding='UTF-8')
+        assert pretty_xml == xmllint_format(xml_str)
+
 def test_membername():
     class Klazz:
         def __init__(self):
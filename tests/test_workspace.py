@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from os import chdir, curdir, walk, stat, chmod, umask
+from os import chdir, curdir, walk, stat, chmod, umask, utime
 import shutil
 import logging
 from stat import filemode
@@ -26,7 +26,7 @@ from ocrd_models import (
 )
 from ocrd_models.ocrd_page import parseString
 from ocrd_models.ocrd_page import TextRegionType, CoordsType, AlternativeImageType
-from ocrd_utils import polygon_mask, xywh_from_polygon, bbox_from_polygon, points_from_polygon
+from ocrd_utils import polygon_mask, xywh_from_polygon, bbox_from_polygon, points_from_polygon, config
 from ocrd_modelfactory import page_from_file
 from ocrd.resolver import Resolver
 from ocrd.workspace import Workspace
@@ -596,6 +596,54 @@ def test_deskewing(plain_workspace):
     reg_array2 = np.array(reg_image2) > 0
     assert 0.98 < np.sum(reg_array == reg_array2) / reg_array.size <= 1.0
 
+def test_image_from_page_alternative_only(plain_workspace):
+    image = Image.new('L', (300, 400))
+    path_orig = plain_workspace.save_image_file(image, 'orig', 'IMG')
+    path_alt = plain_workspace.save_image_file(Image.new('L', (300, 400), 255), 'alt', 'IMG')
+    pcgts = page_from_file(next(plain_workspace.mets.find_files(ID='orig')))
+    page = pcgts.get_Page()
+    page.add_AlternativeImage(AlternativeImageType(filename=path_alt, comments='binarized'))
+    resolved = []
+    resolve = plain_workspace._resolve_image_as_pil
+    plain_workspace._resolve_image_as_pil = lambda url, **kwargs: resolved.append(url) or resolve(url, **kwargs)
+    page_image, _, _ = plain_workspace.image_from_page(page, '', feature_filter='cropped')
+    # original image pixels never decoded
+    assert resolved == [path_alt]
+    assert page_image.getpixel((0, 0)) == 255
+    page_image, _, _ = plain_workspace.image_from_page(page, '', feature_filter='binarized')
+    assert resolved == [path_alt, path_orig]
+    assert page_image.getpixel((0, 0)) == 0
+
+def test_image_cache(tmp_path):
+    config.OCRD_IMAGE_CACHE_SIZE = 1
+    ws = Resolver().workspace_from_nothing(directory=tmp_path)
+    config.reset_defaults()
+    assert ws.image_cache.max_bytes == 1024 ** 2
+    # 3 images of 480 KiB each
+    for name in ['a', 'b', 'c']:
+        Image.new('RGB', (320, 512)).save(tmp_path / f'{name}.png')
+    ws._resolve_image_as_pil('a.png')
+    ws._resolve_image_as_pil('b.png')
+    image = ws._resolve_image_as_pil('a.png')
+    assert (ws.image_cache.hits, ws.image_cache.misses) == (1, 2)
+    # cached images cannot be modified by callers
+    image.paste(255, (0, 0, 320, 512))
+    assert ws._resolve_image_as_pil('a.png').getpixel((0, 0)) == (0, 0, 0)
+    assert (ws.image_cache.hits, ws.image_cache.misses) == (2, 2)
+    # evicts least recently used
+    ws._resolve_image_as_pil('c.png')
+    assert len(ws.image_cache) == 2
+    assert ws.image_cache.nbytes <= ws.image_cache.max_bytes
+    ws._resolve_image_as_pil('a.png')
+    assert (ws.image_cache.hits, ws.image_cache.misses) == (3, 3)
+    ws._resolve_image_as_pil('b.png')
+    assert (ws.image_cache.hits, ws.image_cache.misses) == (3, 4)
+    # invalidated by modification
+    Image.new('RGB', (320, 512), (255, 255, 255)).save(tmp_path / 'b.png')
+    utime(tmp_path / 'b.png', ns=(0, 0))
+    assert ws._resolve_image_as_pil('b.png').getpixel((0, 0)) == (255, 255, 255)
+    assert (ws.image_cache.hits, ws.image_cache.misses) == (3, 5)
+
 def test_downsample_16bit_image(plain_workspace):
     # arrange image
     img_path = Path(plain_workspace.directory, '16bit.tif')